@@ -44,8 +44,14 @@ class Index:
         a shorthand for reduced(**kwargs).collect()
         more performant than using reduced when you only need the collected results
         and not the FilteredIndex to further query
+        use len(reduced(**kwargs)) when only the number of matches is needed
         '''    
     ...
+    def __len__() -> int:
+        '''
+        number of objects in the index
+        '''
+    ...
     def union_with(other: Index):
         '''
         returns a new Index that is the union of this index and another index
@@ -72,6 +78,62 @@ class FilteredIndex:
     def collect() -> list[Indexable]:
         '''
         collects all valid objects in the FilteredIndex and returns them as a list
+        objects that have since left the underlying Index are left out, as in len() and indexing
+        '''
+    ...
+    def values(path: str) -> list[any]:
+        '''
+        value at the dotted attribute path for every object in the FilteredIndex, in id order
+        objects missing any attribute along the path give None
+        '''
+    ...
+    def __len__() -> int:
+        '''
+        number of objects in the FilteredIndex, counted without collecting them
+        '''
+    ...
+    def count() -> int:
+        '''
+        number of objects in the FilteredIndex, same as len()
+        '''
+    ...
+    def __getitem__(idx: int) -> Indexable:
+        '''
+        object at position idx in id order, looked up without collecting the rest
+        '''
+    ...
+    def __and__(other: FilteredIndex) -> FilteredIndex:
+        '''
+        objects in both FilteredIndexes, combined on the allow lists without collecting
+        both operands must come from the same Index
+        '''
+    ...
+    def __or__(other: FilteredIndex) -> FilteredIndex:
+        '''
+        objects in either FilteredIndex
+        '''
+    ...
+    def __sub__(other: FilteredIndex) -> FilteredIndex:
+        '''
+        objects in this FilteredIndex but not in other
+        '''
+    ...
+    def __invert__() -> FilteredIndex:
+        '''
+        objects of the underlying Index that are not in this FilteredIndex
+        '''
+    ...
+    def __iter__() -> iter[Indexable]:
+        '''
+        iterates the objects in the FilteredIndex, shares the collect() result
+        '''
+    ...
+    def set_attr_many(name: str, factory: callable) -> None:
+        '''
+        sets attribute name on every object in the FilteredIndex to factory()
+        the values are built first and the indexes are then updated in a single GIL release
+        each object is moved within its indexes on its own, the update is not batched per attribute
+        the FilteredIndex itself is not re-evaluated after the update
         '''
     ...
     def rebase() -> Index:
@@ -163,4 +225,21 @@ class Indexable:
     All attributes will be indexed unless the attribute name is prefixed with an underscore
     Nested Indexable objects are supported and fully queryable via dot notation.
     '''
+    @classmethod
+    def from_columns(cls, **columns) -> list[Indexable]:
+        '''
+        builds one object per row from equal length columns, keyed by attribute name
+        columns may be lists or numpy arrays
+        objects are created through __new__ only, __init__ is not called
+        '''
+    ...
+    def intern() -> Indexable:
+        '''
+        returns the canonical instance for this class and attribute values, registering self if none exists yet
+        opt in, the canonical instance is shared so mutating it changes it for every holder
+        nested Indexables compare by identity, intern children first to collapse whole subtrees
+        only objects with scalar and Indexable values intern, one holding a list, dict, tuple or set is returned as is
+        the table only holds weak references, and a canonical instance that is mutated stops being canonical
+        '''
+    ...
 ...
@@ -1,26 +1,75 @@
 
+use std::sync::{Arc, Mutex, RwLock, atomic::{AtomicU64, Ordering}};
+
 use croaring::Bitmap;
-use pyo3::{Py, PyResult, Python};
+use pyo3::{Py, PyResult, Python, exceptions::PyValueError, types::PyList};
 
-use crate::index::{Indexable, interfaces::filtered_index::FilteredIndex};
+use crate::index::{Indexable, core::stored_item::{StoredItem, collect_py_refs}, interfaces::filtered_index::FilteredIndex, types::IndexTree};
 
 impl FilteredIndex{
 
+    pub fn new(
+        index: IndexTree,
+        items: Arc<RwLock<Vec<StoredItem>>>,
+        live_items: Arc<RwLock<Bitmap>>,
+        live_generation: Arc<AtomicU64>,
+        allowed_items: Bitmap,
+    ) -> Self {
+        Self {
+            index,
+            items,
+            live_items,
+            live_generation,
+            allowed_items,
+            collected: Arc::new(Mutex::new(None)),
+        }
+    }
+
+    /// The allow list minus every id that has since left the owning index, with the
+    /// generation of the owning allow list it was read at.
+    pub fn current_ids(&self) -> (Bitmap, u64) {
+        let live = self.live_items.read().unwrap();
+        (self.allowed_items.and(&live), self.live_generation.load(Ordering::Acquire))
+    }
+
+    /// Size of `current_ids` from one intersection count, nothing is materialized.
+    pub fn current_len(&self) -> u64 {
+        self.allowed_items.and_cardinality(&self.live_items.read().unwrap())
+    }
+
     pub fn get_from_indexes(&self, py: Python, indexes: &Bitmap) -> PyResult<Vec<Py<Indexable>>>{
         let items = self.items.read().unwrap();
-        let results: Vec<Py<Indexable>> = indexes.iter()
-            .map(|arc| items.get(arc as usize).unwrap().get_py_ref(py))
-            .collect();
-        Ok(results)
+        Ok(collect_py_refs(py, &items, indexes))
+    }
+
+    pub fn get_collected(&self, py: Python) -> PyResult<Py<PyList>> {
+        let mut memo = self.collected.lock().unwrap();
+        let (ids, generation) = self.current_ids();
+        if let Some((seen, list)) = memo.as_ref() {
+            if *seen == generation {
+                return Ok(list.clone_ref(py));
+            }
+        }
+        let list = PyList::new(py, self.get_from_indexes(py, &ids)?)?.unbind();
+        *memo = Some((generation, list.clone_ref(py)));
+        Ok(list)
     }
 
     pub fn filter_from_bitmap(&self, mut bm: Bitmap) -> FilteredIndex {
         bm.and_inplace(&self.allowed_items);
-        FilteredIndex {
-            index: self.index.clone(),
-            items: self.items.clone(),
-            allowed_items: bm
+        self.with_bitmap(bm)
+    }
+
+    pub fn same_source(&self, other: &FilteredIndex) -> PyResult<()> {
+        if Arc::ptr_eq(&self.items, &other.items) {
+            Ok(())
+        } else {
+            Err(PyValueError::new_err("FilteredIndex operands must come from the same Index"))
         }
     }
 
+    pub fn with_bitmap(&self, bm: Bitmap) -> FilteredIndex {
+        FilteredIndex::new(self.index.clone(), self.items.clone(), self.live_items.clone(), self.live_generation.clone(), bm)
+    }
+
 }
\ No newline at end of file
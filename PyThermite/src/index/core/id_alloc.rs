@@ -1,4 +1,4 @@
-use std::sync::{Mutex, atomic::{AtomicU32, Ordering}};
+use std::{cmp::Reverse, collections::BinaryHeap, sync::{Mutex, atomic::{AtomicU32, AtomicUsize, Ordering}}};
 
 use once_cell::sync::Lazy;
 
@@ -6,20 +6,26 @@ use once_cell::sync::Lazy;
 
 static GLOBAL_ID_COUNTER: AtomicU32 = AtomicU32::new(1);
 
-static FREE_IDS: Lazy<Mutex<Vec<u32>>> = Lazy::new(|| Mutex::new(Vec::new()));
+// lowest id first, reuse keeps the id space packed so the id indexed item slabs,
+// value columns and bitmap containers stay as small as the live object count allows
+static FREE_IDS: Lazy<Mutex<BinaryHeap<Reverse<u32>>>> = Lazy::new(|| Mutex::new(BinaryHeap::new()));
+// lets allocation skip the lock while nothing has been freed
+static FREE_COUNT: AtomicUsize = AtomicUsize::new(0);
 
 
 pub fn allocate_id() -> u32 {
-    let mut free = FREE_IDS.lock().unwrap();
-
-    if let Some(id) = free.pop() {
-        id
-    } else {
-        GLOBAL_ID_COUNTER.fetch_add(1, Ordering::SeqCst)
+    if FREE_COUNT.load(Ordering::Acquire) > 0 {
+        let mut free = FREE_IDS.lock().unwrap();
+        if let Some(Reverse(id)) = free.pop() {
+            FREE_COUNT.store(free.len(), Ordering::Release);
+            return id;
+        }
     }
+    GLOBAL_ID_COUNTER.fetch_add(1, Ordering::SeqCst)
 }
 
 pub fn free_id(id: u32) {
     let mut free = FREE_IDS.lock().unwrap();
-    free.push(id);
+    free.push(Reverse(id));
+    FREE_COUNT.store(free.len(), Ordering::Release);
 }
@@ -1,16 +1,17 @@
 
-use std::{fmt, sync::{Arc, MutexGuard, RwLock, RwLockReadGuard, RwLockWriteGuard, Weak}, vec};
+use std::{fmt, sync::{Arc, MutexGuard, RwLock, RwLockReadGuard, RwLockWriteGuard, Weak, atomic::{AtomicU64, Ordering}}, vec};
 use croaring::Bitmap;
 use pyo3::prelude::*;
+use rayon::prelude::*;
 use rustc_hash::FxHashMap;
 use smallvec::SmallVec;
 use smol_str::SmolStr;
 
-use crate::index::{HybridHashmap, Indexable, PyQueryExpr, core::{query::{BulkQueryMapAdder, query_ops::{QueryExpr, evaluate_and_queries_vec}}, structures::{hybrid_set::{HybridSet, HybridSetOps}, m2m::M2MU32, string_interner::INTERNER}}, interfaces::filtered_index::FilteredIndex, types::{DEFAULT_INDEXABLE_ARC, IndexTree, StrId}};
-use crate::index::core::query::{QueryMap, attr_parts, evaluate_query};
+use crate::index::{HybridHashmap, Indexable, PyQueryExpr, core::{query::{query_ops::{QueryExpr, evaluate_and_queries_vec}}, structures::{hybrid_set::{HybridSet, HybridSetOps}, m2m::M2MU32, string_interner::INTERNER}}, interfaces::filtered_index::FilteredIndex, types::{DEFAULT_INDEXABLE_ARC, IndexTree, StrId}};
+use crate::index::core::query::{AttrPath, QueryMap, evaluate_query};
 
-use crate::index::core::stored_item::StoredItem;
-use crate::index::value::PyValue;
+use crate::index::core::stored_item::{StoredItem, collect_py_refs};
+use crate::index::value::{PyValue, RustCastValue};
 
 const QUERY_DEPTH_LEN: usize = 12;
 
@@ -19,10 +20,50 @@ pub struct IndexAPI{
     pub index: IndexTree,
     pub items: Arc<RwLock<Vec<StoredItem>>>,
     pub allowed_items: Arc<RwLock<Bitmap>>,
+    // bumped on every write to allowed_items, lets FilteredIndex tell its memo went stale
+    pub allowed_generation: Arc<AtomicU64>,
     pub parent_child_map: Arc<RwLock<M2MU32>>,
     pub parent_index: Option<Weak<IndexAPI>>,
 }
 
+// objects per worker when a large batch is transposed into attribute columns
+const TRANSPOSE_CHUNK: usize = 4096;
+
+/// Splits objects into per attribute columns of scalar values. Nested and iterable values are
+/// returned as (position, attribute) pairs, positions counted from `offset`.
+fn transpose_columns(
+    objs: &[(Arc<Indexable>, Arc<Py<Indexable>>)],
+    offset: usize,
+) -> (Vec<Vec<(PyValue, u32)>>, Vec<(usize, StrId)>) {
+    let mut columns: Vec<Vec<(PyValue, u32)>> = vec![];
+    let mut complex: Vec<(usize, StrId)> = vec![];
+
+    for (pos, (rust_handle, _)) in objs.iter().enumerate() {
+        let object_id = rust_handle.id;
+        for (key, value) in rust_handle.get_py_values().iter() {
+            match value.get_primitive() {
+                RustCastValue::Int(_)
+                | RustCastValue::Float(_)
+                | RustCastValue::Str(_)
+                | RustCastValue::Bool(_) => {
+                    let attr_id = *key as usize;
+                    if columns.len() <= attr_id {
+                        columns.resize_with(attr_id + 1, Vec::new);
+                    }
+                    // an object holds one value per attribute, so the objects left bound a column
+                    let column = &mut columns[attr_id];
+                    if column.capacity() == 0 {
+                        column.reserve_exact(objs.len() - pos);
+                    }
+                    column.push((value.clone(), object_id));
+                }
+                _ => complex.push((offset + pos, *key)),
+            }
+        }
+    }
+    (columns, complex)
+}
+
 impl IndexAPI{
 
     pub fn new(parent_index: Option<Weak<IndexAPI>>) -> Self {
@@ -30,20 +71,20 @@ impl IndexAPI{
             index: Arc::new(RwLock::new(vec![])),
             items: Arc::new(RwLock::new(vec![])),
             allowed_items: Arc::new(RwLock::new(Bitmap::new())),
+            allowed_generation: Arc::new(AtomicU64::new(0)),
             parent_child_map: Arc::new(RwLock::new(M2MU32::new())),
             parent_index: parent_index,
         }
     }
 
+    pub fn len(&self) -> usize {
+        self.get_allowed_items_reader().cardinality() as usize
+    }
+
     pub fn collect(&self, py:Python) -> PyResult<Vec<Py<Indexable>>> {
-        let mut result = vec![];
         let allowed_items = self.get_allowed_items_reader();
         let items_reader = self.get_items_reader();
-
-        for idx in allowed_items.iter(){
-            result.push(items_reader[idx as usize].get_py_ref(py));
-        }
-        Ok(result)
+        Ok(collect_py_refs(py, &items_reader, &allowed_items))
     }
 
     pub fn get_from_parent_ids(&self, parent_ids: &Bitmap) -> Bitmap {
@@ -58,64 +99,89 @@ impl IndexAPI{
     pub fn add_object_many(
         &self,
         weak_self: Weak<Self>,
-        raw_objs: Vec<(Indexable, Py<Indexable>)>
+        arc_objs: Vec<(Arc<Indexable>, Arc<Py<Indexable>>)>
     ) {
-        // 3 pass - wrap in ARC - add meta to index with locks - add to index maps which may call meta locks
-        let arc_objs: Vec<(Arc<Indexable>, Arc<Py<Indexable>>)> = raw_objs
-            .into_iter()
-            .map(|(idx, py)| (Arc::new(idx), Arc::new(py)))
-            .collect();
-
+        // 2 pass - add meta to index with locks - add to index maps which may call meta locks
         let mut allowed_writer: RwLockWriteGuard<'_, Bitmap> = self.get_allowed_items_writer();
         let mut items_writer = self.get_items_writer();
 
+        // size the item slots once for the whole batch instead of growing mid loop
+        let max_idx = arc_objs.iter().map(|(rust_handle, _)| rust_handle.id as usize).max();
+        if let Some(max_idx) = max_idx {
+            if items_writer.len() <= max_idx {
+                items_writer.resize(max_idx + 1, StoredItem::default());
+            }
+        }
+
+        let mut ids: Vec<u32> = Vec::with_capacity(arc_objs.len());
         for (rust_handle, py_handle) in &arc_objs {
 
             rust_handle.add_index(weak_self.clone());
-            allowed_writer.add(rust_handle.id);
+            ids.push(rust_handle.id);
 
             let idx = rust_handle.id as usize;
-            let stored_item = StoredItem::new(py_handle.clone(), rust_handle.clone());
-
-            if items_writer.len() <= idx{
-                items_writer.resize(idx * 2, StoredItem::default());
-            }
-
-            items_writer[idx] = stored_item;
+            items_writer[idx] = StoredItem::new(py_handle.clone(), rust_handle.clone());
 
         }
+        // one sorted run into the allow list instead of an insert per object
+        ids.sort_unstable();
+        allowed_writer.add_many(&ids);
         drop(allowed_writer);
         drop(items_writer);
 
-        let mut index_reader = self.get_index_reader();
-        let mut delayed_adders: Vec<BulkQueryMapAdder> = index_reader.iter().map(|i| {
-            i.get_bulk_writer()
-        }).collect();
-
-        for (rust_handle, _) in arc_objs {
-            let object_id = rust_handle.id;
-            for (key, value) in rust_handle.get_py_values().iter() {
-                let attr_id = *key as usize;
-                if let Some(qmap) = delayed_adders.get_mut(attr_id) {
-                    qmap.insert(value, object_id);
-                } else {
-                    drop(delayed_adders);
-                    drop(index_reader);
-
-                    let mut writer = self.get_index_writer();
-                    let qmap = QueryMap::new(weak_self.clone());
-                    qmap.insert(value, object_id);
-                    if attr_id >= writer.len() {
-                        writer.resize_with((attr_id + 1) as usize, Default::default); // or None if Option
+        // transpose into per attribute columns so each attribute's maps stay hot while
+        // they are filled. only scalars are batched - nested and iterable values take the
+        // query map locks themselves and are inserted once the bulk writers are released
+        let (columns, complex) = if arc_objs.len() <= TRANSPOSE_CHUNK {
+            transpose_columns(&arc_objs, 0)
+        } else {
+            // each object's values sit behind their own lock, so chunks transpose side by
+            // side and are stitched back together in order, keeping every column id sorted
+            let parts: Vec<(Vec<Vec<(PyValue, u32)>>, Vec<(usize, StrId)>)> = arc_objs
+                .par_chunks(TRANSPOSE_CHUNK)
+                .enumerate()
+                .map(|(chunk_idx, chunk)| transpose_columns(chunk, chunk_idx * TRANSPOSE_CHUNK))
+                .collect();
+            let mut columns: Vec<Vec<(PyValue, u32)>> = vec![];
+            let mut complex: Vec<(usize, StrId)> = vec![];
+            for (part_columns, part_complex) in parts {
+                if columns.len() < part_columns.len() {
+                    columns.resize_with(part_columns.len(), Vec::new);
+                }
+                for (attr_id, column) in part_columns.into_iter().enumerate() {
+                    if columns[attr_id].is_empty() {
+                        columns[attr_id] = column;
+                    } else {
+                        columns[attr_id].extend(column);
                     }
-                    writer[attr_id as usize] = qmap;
-                    
-                    drop(writer);
-                    index_reader = self.get_index_reader();
-                    delayed_adders = index_reader.iter().map(|i| {
-                        i.get_bulk_writer()
-                    }).collect();
                 }
+                complex.extend(part_complex);
+            }
+            (columns, complex)
+        };
+
+        self.ensure_query_maps(&weak_self, columns.len(), |attr_id| !columns[attr_id].is_empty());
+
+        // attribute maps are disjoint, so each column is filled on its own worker with no
+        // contention beyond the shared read lock on the index
+        let index_reader = self.get_index_reader();
+        let query_maps: &[QueryMap] = &index_reader;
+        columns.par_iter().enumerate().for_each(|(attr_id, column)| {
+            if column.is_empty() {
+                return;
+            }
+            let mut adder = query_maps[attr_id].get_bulk_writer();
+            adder.reserve(column.len());
+            for (value, object_id) in column {
+                adder.insert(value, *object_id);
+            }
+        });
+        drop(index_reader);
+
+        for (pos, attr_id) in complex {
+            let rust_handle = &arc_objs[pos].0;
+            if let Some(value) = rust_handle.get_py_values().get(&attr_id) {
+                self.add_index(weak_self.clone(), rust_handle.id, attr_id, value);
             }
         }
     }
@@ -150,9 +216,39 @@ impl IndexAPI{
             items_writer[idx as usize] = stored_item;
         }
 
+        // create any missing attribute maps in one write, then insert every attribute
+        // under a single read guard rather than relocking the index per attribute
+        let attr_len = py_val_hashmap.keys().max().map_or(0, |attr_id| *attr_id as usize + 1);
+        self.ensure_query_maps(&weak_self, attr_len, |attr_id| {
+            py_val_hashmap.get(&(attr_id as StrId)).is_some()
+        });
+
+        let index = self.get_index_reader();
         for (attr_id, value) in py_val_hashmap.iter() {
             // if key.starts_with("_"){continue;}
-            self.add_index(weak_self.clone(), idx, *attr_id, value);
+            index[*attr_id as usize].insert(value, idx);
+        }
+    }
+
+    fn ensure_query_maps(
+        &self,
+        weak_self: &Weak<IndexAPI>,
+        len: usize,
+        is_used: impl Fn(usize) -> bool
+    ) {
+        if self.get_index_reader().len() >= len {
+            return;
+        }
+
+        let mut writer = self.get_index_writer();
+        let current_len = writer.len();
+        if current_len < len {
+            writer.resize_with(len, Default::default);
+            for attr_id in current_len..len {
+                if is_used(attr_id) {
+                    writer[attr_id] = QueryMap::new(weak_self.clone());
+                }
+            }
         }
     }
 
@@ -198,14 +294,7 @@ impl IndexAPI{
     ){
         // this one is not ideal as it needs to trim in place
         // ideally this is a bunch of andnot_inplace calls
-        let index = self.get_index_reader();
-        let all_valid = self.get_allowed_items_reader();
-        let exprs: Vec<QueryExpr> = query.into_iter().map(|(k, v)| {
-            QueryExpr::Eq(k, v)
-        }).collect();
-        
-        let keep = evaluate_and_queries_vec(&index, &all_valid, &exprs);
-        drop(all_valid);
+        let keep = self.evaluate_eq_query(query);
         self.keep_only_from_bitmap(&keep);
     }
 
@@ -231,25 +320,34 @@ impl IndexAPI{
         &self,
         query: FxHashMap<SmolStr, PyValue>
     ) -> FilteredIndex {
+        self.filter_from_bitmap(self.evaluate_eq_query(query))
+    }
+
+    pub fn evaluate_eq_query(
+        &self,
+        query: FxHashMap<SmolStr, PyValue>
+    ) -> Bitmap {
+        // ids stay in bitmap form here, callers decide when to materialize
         let index = self.get_index_reader();
         let all_valid = self.get_allowed_items_reader();
         let exprs: Vec<QueryExpr> = query.into_iter().map(|(k, v)| {
-            QueryExpr::Eq(k, v)
+            QueryExpr::Eq(AttrPath::new(&k), v)
         }).collect();
-        self.filter_from_bitmap(
-            evaluate_and_queries_vec(&index, &all_valid, &exprs)
-        )
+        evaluate_and_queries_vec(&index, &all_valid, &exprs)
     }
 
     pub fn reduced_query(
         &self,
         query: PyQueryExpr,
     ) -> FilteredIndex {
+        self.filter_from_bitmap(self.evaluate(&query.inner))
+    }
+
+    // matching ids only, for callers that never hand a FilteredIndex back to python
+    pub fn evaluate(&self, expr: &QueryExpr) -> Bitmap {
         let index = self.get_index_reader();
         let allowed = self.get_allowed_items_reader();
-        self.filter_from_bitmap(
-            evaluate_query(&index, &allowed, &query.inner)
-        )
+        evaluate_query(&index, &allowed, expr)
     }
 
     pub fn union_with(&self, other: &IndexAPI) -> PyResult<()>{
@@ -299,20 +397,26 @@ impl IndexAPI{
 //        if attr.starts_with("_") {
 //            return;
 //        }
-        
-        if let Some(old_val) = old_pv {
-            self.remove_index(item_id, attr as usize, old_val);
+
+        // swap the value on a single lookup of the attribute map. going through
+        // remove_index here would also prune the map between the remove and the insert
+        {
+            let index = self.get_index_reader();
+            if let Some(qmap) = index.get(attr as usize) {
+                if let Some(old_val) = old_pv {
+                    qmap.remove_id(old_val, item_id);
+                    qmap.check_prune(old_val);
+                }
+                qmap.insert(new_pv, item_id);
+                return;
+            }
         }
         self.add_index(weak_self, item_id, attr, &new_pv);
     }
 
     pub fn get_from_indexes(&self, py: Python, indexes: Bitmap) -> PyResult<Vec<Py<Indexable>>>{
         let items_read = self.get_items_reader();
-        let results: Vec<Py<Indexable>> = indexes.iter()
-            .map(|arc| items_read.get(arc as usize).unwrap().get_py_ref(py))
-            .collect();
-
-        Ok(results)
+        Ok(collect_py_refs(py, &items_read, &indexes))
     }
 
     pub fn add_index(
@@ -343,26 +447,18 @@ impl IndexAPI{
         attr_id: usize,
         py_value: &PyValue
     ){
+        // only the removed value's postings are touched. the map itself is kept even
+        // when its exact keys run out, ints, strs and bools of other objects live
+        // outside that map and resetting it would drop them too
         let index = self.get_index_reader();
-        if index.len() > attr_id {
-            if let Some(val) = index.get(attr_id) { 
-                val.remove_id(py_value, idx);
-                val.check_prune(py_value);
-            };
-
-            if index[attr_id].is_empty(){
-                drop(index);
-                self.get_index_writer()[attr_id] = Default::default();
-            }
+        if let Some(val) = index.get(attr_id) {
+            val.remove_id(py_value, idx);
+            val.check_prune(py_value);
         }
     }
 
     pub fn filter_from_bitmap(&self, bm: Bitmap) -> FilteredIndex {
-        FilteredIndex {
-            index: self.index.clone(),
-            items: self.items.clone(),
-            allowed_items: bm
-        }
+        FilteredIndex::new(self.index.clone(), self.items.clone(), self.allowed_items.clone(), self.allowed_generation.clone(), bm)
     }
 
     pub fn is_attr_equal(&self, id: usize, str_id: StrId, val: &PyValue) -> bool {
@@ -395,7 +491,11 @@ impl IndexAPI{
     }
 
     fn get_allowed_items_writer(&self) -> RwLockWriteGuard<'_, Bitmap> {
-        self.allowed_items.write().unwrap()
+        let writer = self.allowed_items.write().unwrap();
+        // bumped under the write lock, so a reader holding the read lock sees a generation
+        // that matches the bitmap it reads
+        self.allowed_generation.fetch_add(1, Ordering::Release);
+        writer
         //self.allowed_items.try_write().expect("index writer deadlock")
     }
 
@@ -2,6 +2,8 @@ use std::sync::{Arc, RwLock, RwLockWriteGuard, Weak};
 
 use ordered_float::OrderedFloat;
 use pyo3::{Python, types::{PyListMethods, PySetMethods, PyTupleMethods}};
+use rayon::slice::ParallelSliceMut;
+use smol_str::SmolStr;
 
 use crate::index::{core::{index::IndexAPI, query::{QueryMap, b_tree::Key}, stored_item::StoredItem, structures::{boolean_bitmap::BooleanBitmap, composite_key::CompositeKey128, hybrid_set::{HybridSet, HybridSetOps}, ordered_bitmap::NumericalBitmap, positional_bitmap::PositionalBitmap, shards::ShardedHashMap}}, types::StrId, value::{PyIterable, PyValue, RustCastValue, StoredIndexable}};
 
@@ -12,6 +14,13 @@ pub struct BulkQueryMapAdder<'a> {
     pub num_ordered: RwLockWriteGuard<'a, NumericalBitmap>,
     pub bool_map: RwLockWriteGuard<'a, BooleanBitmap>,
     map: &'a QueryMap,
+    // numeric keys are gathered as a column and sliced in one pass when the writer drops
+    num_values: Vec<u128>,
+    num_ids: Vec<u32>,
+    // strings are sorted on drop so each distinct value is written once per position
+    str_values: Vec<(SmolStr, u32)>,
+    // expected number of inserts, a buffer is sized to it when first used
+    size_hint: usize,
 }
 
 impl<'a> BulkQueryMapAdder<'a> {
@@ -21,9 +30,19 @@ impl<'a> BulkQueryMapAdder<'a> {
             num_ordered: map.write_num_ordered(),
             bool_map: map.get_bool_map_writer(),
             map: map,
+            num_values: Vec::new(),
+            num_ids: Vec::new(),
+            str_values: Vec::new(),
+            size_hint: 0,
         }
     }
 
+    /// Sizes the column buffers for `additional` inserts. Only the buffers the inserted
+    /// types actually use get allocated, once, on their first push.
+    pub fn reserve(&mut self, additional: usize) {
+        self.size_hint += additional;
+    }
+
     #[inline(always)]
     pub fn insert(&mut self, value: &PyValue, obj_id: u32){
         // Insert into the right ordered map based on primitive type
@@ -57,12 +76,32 @@ impl<'a> BulkQueryMapAdder<'a> {
     #[inline]
     fn insert_num_ordered(&mut self, key: Key, obj_id: u32){
         let composit_key = CompositeKey128::new(key, obj_id);
-        self.num_ordered.add_delayed(composit_key.get_value_bits(), obj_id);
+        if self.num_ids.capacity() == 0 {
+            self.num_values.reserve_exact(self.size_hint);
+            self.num_ids.reserve_exact(self.size_hint);
+        }
+        self.num_values.push(composit_key.get_value_bits());
+        self.num_ids.push(obj_id);
     }
 
     #[inline]
-    fn insert_str(&mut self, value: &str, obj_id: u32) {
-        self.str_radix_map.add_delayed(value, obj_id);
+    fn insert_str(&mut self, value: &SmolStr, obj_id: u32) {
+        if self.str_values.capacity() == 0 {
+            self.str_values.reserve_exact(self.size_hint);
+        }
+        self.str_values.push((value.clone(), obj_id));
+    }
+
+    fn flush_str(&mut self) {
+        // equal strings end up adjacent with their ids ascending, so every run becomes
+        // one sorted add_many per byte position instead of one add per id
+        self.str_values.par_sort_unstable();
+        let mut ids: Vec<u32> = Vec::new();
+        for run in self.str_values.chunk_by(|a, b| a.0 == b.0) {
+            ids.clear();
+            ids.extend(run.iter().map(|(_, id)| *id));
+            self.str_radix_map.add_many(&run[0].0, &ids);
+        }
     }
 
     #[inline]
@@ -74,6 +113,8 @@ impl<'a> BulkQueryMapAdder<'a> {
 impl<'a> Drop for BulkQueryMapAdder<'a> {
     fn drop(&mut self) {
         // self.str_radix_map.flush();
+        self.num_ordered.add_many(&self.num_values, &self.num_ids);
+        self.flush_str();
         self.num_ordered.flush();
         self.bool_map.flush();
         self.str_radix_map.flush();
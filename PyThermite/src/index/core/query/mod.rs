@@ -6,4 +6,4 @@ mod query_ops_removal;
 
 pub use query::QueryMap;
 pub use delayed_query::BulkQueryMapAdder;
-pub use query_ops::{attr_parts, evaluate_query};
+pub use query_ops::{AttrPath, evaluate_query};
@@ -9,14 +9,15 @@ use smol_str::SmolStr;
 
 const QUERY_DEPTH_LEN: usize = 12;
 
-use crate::index::{Index, core::{id_alloc::{allocate_id, free_id}, query::{BulkQueryMapAdder, attr_parts, b_tree::ranged_b_tree::BitMapBTreeIter}, structures::{boolean_bitmap::BooleanBitmap, composite_key::CompositeKey128, hybrid_set::{HybridSet, HybridSetOps}, ordered_bitmap::NumericalBitmap, positional_bitmap::PositionalBitmap, shards::ShardedHashMap}}, types::StrId, value::{PyIterable, PyValue, RustCastValue, StoredIndexable}};
+use crate::index::{Index, core::{id_alloc::{allocate_id, free_id}, query::{BulkQueryMapAdder, b_tree::ranged_b_tree::BitMapBTreeIter}, structures::{boolean_bitmap::BooleanBitmap, composite_key::CompositeKey128, hybrid_set::{HybridSet, HybridSetOps}, ordered_bitmap::NumericalBitmap, positional_bitmap::PositionalBitmap, shards::ShardedHashMap}}, types::StrId, value::{PyIterable, PyValue, RustCastValue, StoredIndexable}};
 use crate::index::core::index::IndexAPI;
+use crate::index::core::structures::string_interner::PrehashedBuildHasher;
 use crate::index::core::stored_item::StoredItem;
 use crate::index::core::query::b_tree::{BitMapBTree, Key};
 
 #[derive(Default)]
 pub struct QueryMap {
-    pub exact: ShardedHashMap<PyValue, HybridSet>,
+    pub exact: ShardedHashMap<PyValue, HybridSet, PrehashedBuildHasher>,
     pub str_radix_map: RwLock<PositionalBitmap>,
     pub num_ordered: RwLock<NumericalBitmap>,
     pub bool_map: RwLock<BooleanBitmap>,
@@ -38,7 +39,7 @@ impl QueryMap {
             Arc::new(RwLock::new(Vec::new()))
         };
         Self{
-            exact: ShardedHashMap::<PyValue, HybridSet>::with_shard_count(16),
+            exact: ShardedHashMap::with_shard_count(16),
             str_radix_map: RwLock::new(PositionalBitmap::new()),
             parent: parent.clone(),
             num_ordered: RwLock::new(NumericalBitmap::new()),
@@ -1,13 +1,15 @@
 
-use std::{collections:: HashSet, ops::Bound};
+use std::{cell::RefCell, fmt, ops::Bound, sync::{Mutex, atomic::{AtomicBool, Ordering}}};
 
 use rustc_hash::FxHashMap;
 use croaring::Bitmap;
 use ordered_float::OrderedFloat;
 use pyo3::{PyAny, PyResult, types::{PyAnyMethods, PyString}};
+use rayon::prelude::*;
+use smallvec::SmallVec;
 use smol_str::SmolStr;
 
-use crate::index::{core::{query::QueryMap, structures::{composite_key::CompositeKey128, hybrid_set::HybridSetOps, string_interner::{INTERNER, StrInternerView}}}, interfaces::PyQueryExpr, value::{PyValue, RustCastValue}};
+use crate::index::{core::{query::QueryMap, structures::{bounded_cache::BoundedCache, composite_key::CompositeKey128, hybrid_set::HybridSetOps, string_interner::{INTERNER, StrInternerView}}}, types::StrId, value::{PyValue, RustCastValue}};
 
 impl QueryMap {
 
@@ -105,6 +107,26 @@ impl QueryMap {
         res
     }
 
+    // numeric In over a narrowed candidate set, each candidate's value is checked against
+    // the whole list at once rather than an exact slice walk per listed value
+    fn num_in(&self, values: &[PyValue], all_valid: &Bitmap) -> Option<Bitmap> {
+        // list elements are indexed under their own ids, only the exact walk finds those
+        if !self.get_masked_ids_reader().is_empty() {
+            return None;
+        }
+        let mut wanted: SmallVec<[u128; 8]> = SmallVec::with_capacity(values.len());
+        for v in values {
+            match v.get_primitive() {
+                RustCastValue::Int(i) => wanted.push(CompositeKey128::encode_i64_to_float76(*i)),
+                RustCastValue::Float(f) => wanted.push(CompositeKey128::encode_f64_to_float76(OrderedFloat(*f))),
+                _ => return None,
+            }
+        }
+        wanted.sort_unstable();
+        wanted.dedup();
+        self.read_num_ordered().get_in_from_valid(&wanted, all_valid)
+    }
+
     pub fn eq(&self, val: &PyValue, all_valid: &Bitmap) -> Bitmap {
 
         let mut res = match val.get_primitive() {
@@ -123,11 +145,9 @@ impl QueryMap {
                 self.get_bool_map_reader().get_exact(*b).clone()
             }
             _ => {
-                if let Some(res) = self.exact.get(val){
-                    res.as_bitmap()
-                } else {
-                    Bitmap::new()
-                }
+                // read the posting list in place rather than cloning the set out of the shard
+                self.exact.with_value(val, |hs| hs.as_bitmap())
+                    .unwrap_or_else(Bitmap::new)
             }
         };
         self.unmask_ids(&mut res);
@@ -175,23 +195,23 @@ impl QueryMap {
 
 #[derive(Clone, Debug)]
 pub enum QueryExpr {
-    Eq(SmolStr, PyValue),
-    Ne(SmolStr, PyValue),
+    Eq(AttrPath, PyValue),
+    Ne(AttrPath, PyValue),
     Not(Box<QueryExpr>),
 
-    In(SmolStr, Vec<PyValue>),
+    In(AttrPath, Vec<PyValue>),
     And(Vec<QueryExpr>),
     Or(Vec<QueryExpr>),
     // numeric ops
-    Gt(SmolStr, PyValue),
-    Ge(SmolStr, PyValue),
-    Lt(SmolStr, PyValue),
-    Le(SmolStr, PyValue),
-    Bt(SmolStr, PyValue, PyValue),
+    Gt(AttrPath, PyValue),
+    Ge(AttrPath, PyValue),
+    Lt(AttrPath, PyValue),
+    Le(AttrPath, PyValue),
+    Bt(AttrPath, PyValue, PyValue),
     // string ops
-    StartsWi(SmolStr, PyValue),
-    EndsWi(SmolStr, PyValue),
-    Contains(SmolStr, PyValue),
+    StartsWi(AttrPath, PyValue),
+    EndsWi(AttrPath, PyValue),
+    Contains(AttrPath, PyValue),
 }
 
 impl QueryExpr {
@@ -213,15 +233,169 @@ impl QueryExpr {
             QueryExpr::Bt(_, _, _) => 13,
         }
     }
+
+    /// Builds an And, splicing in the terms of directly nested Ands so the whole
+    /// group is ordered by selectivity and short circuited as one.
+    pub fn and_of(exprs: Vec<QueryExpr>) -> QueryExpr {
+        let mut flat = Vec::with_capacity(exprs.len());
+        for expr in exprs {
+            match expr {
+                QueryExpr::And(inner) => flat.extend(inner),
+                other => flat.push(other),
+            }
+        }
+        QueryExpr::And(flat)
+    }
+
+    /// Or counterpart of `and_of`.
+    pub fn or_of(exprs: Vec<QueryExpr>) -> QueryExpr {
+        let mut flat = Vec::with_capacity(exprs.len());
+        for expr in exprs {
+            match expr {
+                QueryExpr::Or(inner) => flat.extend(inner),
+                other => flat.push(other),
+            }
+        }
+        QueryExpr::Or(flat)
+    }
+
+    pub fn not_of(expr: QueryExpr) -> QueryExpr {
+        match expr {
+            // a single term And keeps the result trimmed to the valid ids like the double negation did
+            QueryExpr::Not(inner) => QueryExpr::And(vec![*inner]),
+            other => QueryExpr::Not(Box::new(other)),
+        }
+    }
+
+    // rough fraction of ids a predicate keeps, used to intersect the most selective first
+    pub fn estimated_selectivity(&self, index: &Vec<QueryMap>, population: u64) -> f64 {
+        match self {
+            QueryExpr::Eq(attr, value) => eq_selectivity(index, population, attr, value),
+            QueryExpr::Ne(attr, value) => 1.0 - eq_selectivity(index, population, attr, value),
+            QueryExpr::Not(inner) => 1.0 - inner.estimated_selectivity(index, population),
+            QueryExpr::In(attr, values) => {
+                values.iter()
+                    .map(|v| eq_selectivity(index, population, attr, v))
+                    .sum::<f64>()
+                    .min(1.0)
+            }
+            QueryExpr::And(exprs) => {
+                exprs.iter().map(|e| e.estimated_selectivity(index, population)).product()
+            }
+            QueryExpr::Or(exprs) => {
+                1.0 - exprs.iter().map(|e| 1.0 - e.estimated_selectivity(index, population)).product::<f64>()
+            }
+            QueryExpr::Lt(_, _)
+            | QueryExpr::Le(_, _)
+            | QueryExpr::Gt(_, _)
+            | QueryExpr::Ge(_, _) => 0.33,
+            QueryExpr::Bt(_, _, _) => 0.1,
+            QueryExpr::StartsWi(_, _) | QueryExpr::EndsWi(_, _) => 0.1,
+            QueryExpr::Contains(_, _) => 0.25,
+        }
+    }
+}
+
+const DEFAULT_EQ_SELECTIVITY: f64 = 0.1;
+// an Or goes parallel only once its two costliest branches are each estimated to touch
+// this many rows, below that a branch is cheaper than handing it to another thread
+const PARALLEL_OR_MIN_ROWS: f64 = 10_000.0;
+
+fn eq_selectivity(index: &Vec<QueryMap>, population: u64, attr: &AttrPath, value: &PyValue) -> f64 {
+    match value.get_primitive() {
+        RustCastValue::Bool(_) => 0.5,
+        RustCastValue::Str(s) => {
+            // dictionary encoded columns know the posting size of every value
+            if attr.is_nested() || population == 0 {
+                return DEFAULT_EQ_SELECTIVITY;
+            }
+            index.get(attr.base_id())
+                .and_then(|qm| qm.read_str_radix_map().exact_count(s))
+                .map_or(DEFAULT_EQ_SELECTIVITY, |hits| (hits as f64 / population as f64).min(1.0))
+        }
+        RustCastValue::Ind(_) | RustCastValue::Unknown => {
+            if attr.is_nested() {
+                return DEFAULT_EQ_SELECTIVITY;
+            }
+            let qm = match index.get(attr.base_id()) {
+                Some(qm) => qm,
+                None => return 0.0,
+            };
+            // exact keyed values carry their own posting size, one hash probe gives the real count
+            if population > 0 {
+                let hits = qm.exact.with_value(value, |set| set.cardinality()).unwrap_or(0);
+                return (hits as f64 / population as f64).min(1.0);
+            }
+            let distinct = qm.exact.len();
+            if distinct == 0 {
+                DEFAULT_EQ_SELECTIVITY
+            } else {
+                1.0 / distinct as f64
+            }
+        }
+        _ => DEFAULT_EQ_SELECTIVITY,
+    }
+}
+
+/// A dotted attribute path with every segment interned when the query is built,
+/// so evaluation indexes the query maps directly instead of splitting and
+/// interning the path again on every call.
+#[derive(Clone)]
+pub struct AttrPath {
+    path: SmolStr,
+    ids: SmallVec<[StrId; 4]>,
+}
+
+const ATTR_PATH_CACHE_LIMIT: usize = 4096;
+
+thread_local! {
+    // interned ids never change once handed out, so a resolved path cannot go stale
+    static ATTR_PATH_IDS: RefCell<BoundedCache<SmolStr, SmallVec<[StrId; 4]>>> = RefCell::new(BoundedCache::new(ATTR_PATH_CACHE_LIMIT));
+}
+
+impl AttrPath {
+    pub fn new(path: &str) -> Self {
+        // queries are rebuilt with the same paths, resolve each distinct path only once
+        let cached = ATTR_PATH_IDS.with(|cache| cache.borrow_mut().get(path).cloned());
+        let ids = cached.unwrap_or_else(|| {
+            let ids: SmallVec<[StrId; 4]> = path.split('.').map(|part| INTERNER.intern(part)).collect();
+            ATTR_PATH_IDS.with(|cache| cache.borrow_mut().insert(SmolStr::new(path), ids.clone()));
+            ids
+        });
+        Self {
+            path: SmolStr::new(path),
+            ids,
+        }
+    }
+
+    #[inline(always)]
+    pub fn base_id(&self) -> usize {
+        self.ids[0] as usize
+    }
+
+    #[inline(always)]
+    pub fn ids(&self) -> &[StrId] {
+        &self.ids
+    }
+
+    #[inline(always)]
+    pub fn is_nested(&self) -> bool {
+        self.ids.len() > 1
+    }
+
+    /// The path below the first segment, reusing the interned ids.
+    pub fn tail(&self) -> AttrPath {
+        let rest = self.path.split_once('.').map_or("", |(_, rest)| rest);
+        Self {
+            path: SmolStr::new(rest),
+            ids: SmallVec::from_slice(&self.ids[1..]),
+        }
+    }
 }
 
-pub fn attr_parts(attr: SmolStr) -> (SmolStr, Option<SmolStr>) {
-    if let Some(pos) = attr.find('.') {
-        let (base, rest) = attr.split_at(pos);
-        let rest = &rest[1..];
-        (SmolStr::new(base), Some(SmolStr::new(rest)))
-    } else {
-        (attr, None)
+impl fmt::Debug for AttrPath {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        fmt::Debug::fmt(&self.path, f)
     }
 }
 
@@ -229,9 +403,8 @@ pub fn evaluate_nested_query(
     nested_map: &QueryMap,
     expr: &QueryExpr,
 ) -> Bitmap {
-    let wrapper = PyQueryExpr{inner: expr.clone()};
-    let reduced = nested_map.nested.reduced_query(wrapper);
-    nested_map.get_allowed_parents(&reduced.allowed_items)
+    let matched = nested_map.nested.evaluate(expr);
+    nested_map.get_allowed_parents(&matched)
 }
 
 pub fn evaluate_query(
@@ -241,11 +414,9 @@ pub fn evaluate_query(
 ) -> Bitmap {
     match expr {
         QueryExpr::Eq(attr, value) => {
-            let (base_attr, nested_attr) = attr_parts(attr.clone());
-            let base_attr_id = INTERNER.intern(&base_attr) as usize;
-            if let Some(qm) = index.get(base_attr_id){
-                if let Some(nested_attr) = nested_attr {
-                    let query = QueryExpr::Eq(nested_attr, value.clone());
+            if let Some(qm) = index.get(attr.base_id()){
+                if attr.is_nested() {
+                    let query = QueryExpr::Eq(attr.tail(), value.clone());
                     evaluate_nested_query(qm, &query)
                 } else {
                     qm.eq(value, all_valid)
@@ -255,32 +426,36 @@ pub fn evaluate_query(
             }
         }
         QueryExpr::Ne(attr, value ) => {
-            evaluate_query(
-                index,
-                all_valid,
-                &QueryExpr::Not(Box::new(QueryExpr::Eq(attr.clone(), value.clone())))
-            )
+            // negate in place rather than building a Not(Eq) with a cloned path and value
+            let matches = if let Some(qm) = index.get(attr.base_id()) {
+                if attr.is_nested() {
+                    evaluate_nested_query(qm, &QueryExpr::Eq(attr.tail(), value.clone()))
+                } else {
+                    qm.eq(value, all_valid)
+                }
+            } else {
+                Bitmap::new()
+            };
+            all_valid - &matches
         }
         QueryExpr::In(attr, values) => {
-            let (base_attr, nested_attr) = attr_parts(attr.clone());
             let mut result;
-            let base_attr_id = INTERNER.intern(&base_attr) as usize;
-            if let Some(qm) = index.get(base_attr_id) {
+            if let Some(qm) = index.get(attr.base_id()) {
         
-                if let Some(nested_attr) = nested_attr {
-                    let query = QueryExpr::In(nested_attr, values.clone());
+                if attr.is_nested() {
+                    let query = QueryExpr::In(attr.tail(), values.clone());
                     result = evaluate_nested_query(qm, &query);
+                } else if let Some(hits) = qm.num_in(values, all_valid) {
+                    result = hits;
                 } else {
-                    result = Bitmap::new();
-                    for v in values {
-                        let mut r = evaluate_query(
-                            index,
-                            all_valid,
-                            &QueryExpr::Eq(attr.clone(), v.clone())
-                        );
-                        r.and_inplace(all_valid);
-                        result.or_inplace(&r);
-                    }
+                    // union every match in one fast_or, croaring defers the container
+                    // cardinality fixups to the end instead of redoing them per value
+                    let matches: Vec<Bitmap> = values.iter()
+                        .map(|v| qm.eq(v, all_valid))
+                        .collect();
+                    let refs: Vec<&Bitmap> = matches.iter().collect();
+                    result = Bitmap::fast_or(&refs);
+                    result.and_inplace(all_valid);
                 }
 
             } else {
@@ -289,11 +464,9 @@ pub fn evaluate_query(
             result
         }
         QueryExpr::Gt(attr, value) => {
-            let (base_attr, nested_attr) = attr_parts(attr.clone());
-            let base_attr_id = INTERNER.intern(&base_attr) as usize;
-            if let Some(qm) = index.get(base_attr_id) {
-                if let Some(nested_attr) = nested_attr {
-                    let query = QueryExpr::Gt(nested_attr, value.clone());
+            if let Some(qm) = index.get(attr.base_id()) {
+                if attr.is_nested() {
+                    let query = QueryExpr::Gt(attr.tail(), value.clone());
                     evaluate_nested_query(qm, &query)
                 } else {
                     qm.gt(value.get_primitive(), all_valid)
@@ -303,11 +476,9 @@ pub fn evaluate_query(
             }
         }
         QueryExpr::Ge(attr, value) => {
-            let (base_attr, nested_attr) = attr_parts(attr.clone());
-            let base_attr_id = INTERNER.intern(&base_attr) as usize;
-            if let Some(qm) = index.get(base_attr_id) {
-                if let Some(nested_attr) = nested_attr {
-                    let query = QueryExpr::Ge(nested_attr, value.clone());
+            if let Some(qm) = index.get(attr.base_id()) {
+                if attr.is_nested() {
+                    let query = QueryExpr::Ge(attr.tail(), value.clone());
                     evaluate_nested_query(qm, &query)
                 } else {
                     qm.ge(value.get_primitive(), all_valid)
@@ -317,11 +488,9 @@ pub fn evaluate_query(
             }
         }
         QueryExpr::Le(attr, value) => {
-            let (base_attr, nested_attr) = attr_parts(attr.clone());
-            let base_attr_id = INTERNER.intern(&base_attr) as usize;
-            if let Some(qm) = index.get(base_attr_id) {
-                if let Some(nested_attr) = nested_attr {
-                    let query = QueryExpr::Le(nested_attr, value.clone());
+            if let Some(qm) = index.get(attr.base_id()) {
+                if attr.is_nested() {
+                    let query = QueryExpr::Le(attr.tail(), value.clone());
                     evaluate_nested_query(qm, &query)
                 } else {
                     qm.le(value.get_primitive(), all_valid)
@@ -331,11 +500,9 @@ pub fn evaluate_query(
             }
         }
         QueryExpr::Lt(attr, value) => {
-            let (base_attr, nested_attr) = attr_parts(attr.clone());
-            let base_attr_id = INTERNER.intern(&base_attr) as usize;
-            if let Some(qm) = index.get(base_attr_id) {
-                if let Some(nested_attr) = nested_attr {
-                    let query = QueryExpr::Lt(nested_attr, value.clone());
+            if let Some(qm) = index.get(attr.base_id()) {
+                if attr.is_nested() {
+                    let query = QueryExpr::Lt(attr.tail(), value.clone());
                     evaluate_nested_query(qm, &query)
                 } else {
                     qm.lt(value.get_primitive(), all_valid)
@@ -345,11 +512,9 @@ pub fn evaluate_query(
             }
         }
         QueryExpr::Bt(attr, lower, upper) => {
-            let (base_attr, nested_attr) = attr_parts(attr.clone());
-            let base_attr_id = INTERNER.intern(&base_attr) as usize;
-            if let Some(qm) = index.get(base_attr_id) {
-                if let Some(nested_attr) = nested_attr {
-                    let query = QueryExpr::Bt(nested_attr, lower.clone(), upper.clone());
+            if let Some(qm) = index.get(attr.base_id()) {
+                if attr.is_nested() {
+                    let query = QueryExpr::Bt(attr.tail(), lower.clone(), upper.clone());
                     evaluate_nested_query(qm, &query)
                 } else {
                     qm.bt(lower.get_primitive(), upper.get_primitive(), all_valid)
@@ -380,22 +545,13 @@ pub fn evaluate_query(
 //            result
         }
         QueryExpr::Or(exprs) => {
-            evaluate_queries_vec(index, all_valid, exprs)
-                .into_iter()
-                .reduce(|mut a, b| {
-                    a.or_inplace(&b); // mutate `a` in-place
-                    a
-                })
-                .unwrap_or_else(Bitmap::new) // handle empty exprs
+            evaluate_or_queries_vec(index, all_valid, exprs)
         }
         
         QueryExpr::StartsWi(attr, py_value) => {
-            let (base_attr, nested_attr) = attr_parts(attr.clone());
-            let base_attr_id = INTERNER.intern(&base_attr) as usize;
-
-            if let Some(qm) = index.get(base_attr_id) {
-                if let Some(nested_attr) = nested_attr {
-                    let query = QueryExpr::StartsWi(nested_attr, py_value.clone());
+            if let Some(qm) = index.get(attr.base_id()) {
+                if attr.is_nested() {
+                    let query = QueryExpr::StartsWi(attr.tail(), py_value.clone());
                     evaluate_nested_query(qm, &query)
                 } else {
                     qm.starts_with(py_value.get_primitive(), all_valid)
@@ -405,12 +561,9 @@ pub fn evaluate_query(
             }
         },
         QueryExpr::EndsWi(attr, py_value) => {
-            let (base_attr, nested_attr) = attr_parts(attr.clone());
-            let base_attr_id = INTERNER.intern(&base_attr) as usize;
-
-            if let Some(qm) = index.get(base_attr_id) {
-                if let Some(nested_attr) = nested_attr {
-                    let query = QueryExpr::EndsWi(nested_attr, py_value.clone());
+            if let Some(qm) = index.get(attr.base_id()) {
+                if attr.is_nested() {
+                    let query = QueryExpr::EndsWi(attr.tail(), py_value.clone());
                     evaluate_nested_query(qm, &query)
                 } else {
                     qm.ends_with(py_value.get_primitive(), all_valid)
@@ -420,12 +573,9 @@ pub fn evaluate_query(
             }
         },
         QueryExpr::Contains(attr, py_value) => {
-            let (base_attr, nested_attr) = attr_parts(attr.clone());
-            let base_attr_id = INTERNER.intern(&base_attr) as usize;
-
-            if let Some(qm) = index.get(base_attr_id) {
-                if let Some(nested_attr) = nested_attr {
-                    let query = QueryExpr::Contains(nested_attr, py_value.clone());
+            if let Some(qm) = index.get(attr.base_id()) {
+                if attr.is_nested() {
+                    let query = QueryExpr::Contains(attr.tail(), py_value.clone());
                     evaluate_nested_query(qm, &query)
                 } else {
                     qm.contains(py_value.get_primitive(), all_valid)
@@ -453,14 +603,106 @@ pub fn evaluate_and_queries_vec(
     all_valid: &Bitmap,
     exprs: &Vec<QueryExpr>,
 ) -> Bitmap {
-    let mut all_valid = all_valid.clone();
+    // nothing to order for a single predicate - skip the clone, the vec and the sort
+    if let [expr] = exprs.as_slice() {
+        let mut res = evaluate_query(index, all_valid, expr);
+        res.and_inplace(all_valid);
+        return res;
+    }
+
+    // most selective first so later predicates run against the smallest candidate set
+    let mut ordered = order_by_selectivity(index, all_valid, exprs, false).into_iter();
+
+    // seed from the cheapest predicate so the copy is of its result and not of every valid id
+    let mut res = match ordered.next() {
+        Some(first) => evaluate_query(index, all_valid, first),
+        None => return all_valid.clone(),
+    };
+    res.and_inplace(all_valid);
+
+    for o in ordered {
+        if res.is_empty() {
+            break;
+        }
+        res.and_inplace(&evaluate_query(index, &res, o));
+    }
+    res
+}
+
+pub fn evaluate_or_queries_vec(
+    index: &Vec<QueryMap>,
+    all_valid: &Bitmap,
+    exprs: &Vec<QueryExpr>,
+) -> Bitmap {
+    if let [expr] = exprs.as_slice() {
+        return evaluate_query(index, all_valid, expr);
+    }
+
+    // broadest first so the undecided ids shrink fastest
+    let ordered = order_by_selectivity(index, all_valid, exprs, true);
+
+    // two heavy branches are worth more run side by side than narrowed one after another
+    let population = all_valid.cardinality();
+    let second_rows = ordered.get(1)
+        .map_or(0.0, |expr| expr.estimated_selectivity(index, population) * population as f64);
+    if second_rows >= PARALLEL_OR_MIN_ROWS {
+        return evaluate_or_parallel(index, all_valid, &ordered);
+    }
+
+    // each later branch only looks at ids no earlier branch matched and the walk stops
+    // once none are left
+    let mut ordered = ordered.into_iter();
+    let mut res = match ordered.next() {
+        Some(first) => evaluate_query(index, all_valid, first),
+        None => return Bitmap::new(),
+    };
+    let mut remaining = all_valid - &res;
 
-    let mut ordered: Vec<&QueryExpr> = exprs.iter().collect();
-    ordered.sort_by_key(|expr| expr.estimated_cost());
     for o in ordered {
-        all_valid.and_inplace(&evaluate_query(index, &all_valid, o));
+        if remaining.is_empty() {
+            break;
+        }
+        res.or_inplace(&evaluate_query(index, &remaining, o));
+        remaining.andnot_inplace(&res);
     }
-    all_valid
+    res
+}
+
+// every branch scans the full candidate set on its own worker, in selectivity order.
+// once the running union covers every candidate, branches not yet started are skipped
+fn evaluate_or_parallel(index: &Vec<QueryMap>, all_valid: &Bitmap, ordered: &[&QueryExpr]) -> Bitmap {
+    let union = Mutex::new(Bitmap::new());
+    let full = AtomicBool::new(false);
+    ordered.par_iter().for_each(|expr| {
+        if full.load(Ordering::Acquire) {
+            return;
+        }
+        let matches = evaluate_query(index, all_valid, expr);
+        let mut acc = union.lock().unwrap();
+        acc.or_inplace(&matches);
+        if all_valid.is_subset(&acc) {
+            full.store(true, Ordering::Release);
+        }
+    });
+    union.into_inner().unwrap()
+}
+
+fn order_by_selectivity<'a>(
+    index: &Vec<QueryMap>,
+    all_valid: &Bitmap,
+    exprs: &'a [QueryExpr],
+    descending: bool,
+) -> Vec<&'a QueryExpr> {
+    // the static cost only breaks ties
+    let population = all_valid.cardinality();
+    let mut ordered: Vec<(f64, u32, &QueryExpr)> = exprs.iter()
+        .map(|expr| (expr.estimated_selectivity(index, population), expr.estimated_cost(), expr))
+        .collect();
+    ordered.sort_unstable_by(|a, b| {
+        let by_sel = if descending { b.0.total_cmp(&a.0) } else { a.0.total_cmp(&b.0) };
+        by_sel.then(a.1.cmp(&b.1))
+    });
+    ordered.into_iter().map(|(_, _, expr)| expr).collect()
 }
 
 pub fn kwargs_to_query<'py>(
@@ -1,13 +1,14 @@
 use croaring::Bitmap;
 
-use crate::index::{Index, core::{query::{BulkQueryMapAdder, QueryMap, attr_parts, b_tree::ranged_b_tree::BitMapBTreeIter}, structures::{boolean_bitmap::BooleanBitmap, composite_key::CompositeKey128, hybrid_set::{HybridSet, HybridSetOps}, ordered_bitmap::NumericalBitmap, positional_bitmap::PositionalBitmap, shards::ShardedHashMap}}, types::StrId, value::{PyIterable, PyValue, RustCastValue, StoredIndexable}};
+use crate::index::{Index, core::{query::{BulkQueryMapAdder, QueryMap, b_tree::ranged_b_tree::BitMapBTreeIter}, structures::{boolean_bitmap::BooleanBitmap, composite_key::CompositeKey128, hybrid_set::{HybridSet, HybridSetOps}, ordered_bitmap::NumericalBitmap, positional_bitmap::PositionalBitmap, shards::ShardedHashMap}}, types::StrId, value::{PyIterable, PyValue, RustCastValue, StoredIndexable}};
 
 
 impl QueryMap {
 
     pub fn keep_only(&self, keep: &Bitmap) {
+        let keep_set = HybridSet::Large(keep.clone());
         self.exact.for_each_mut(|_, bm| {
-            bm.and_inplace(&HybridSet::Large(keep.clone()));
+            bm.and_inplace(&keep_set);
         });
         self.write_str_radix_map().keep_only(keep);
         self.write_num_ordered().keep_only(keep);
@@ -1,9 +1,33 @@
+use croaring::Bitmap;
 use pyo3::{Bound, IntoPyObject, Py, PyAny, PyRef, Python};
 use std::{hash::{Hash, Hasher}, sync::{Arc, Weak}};
 
 use crate::index::{core::{index::IndexAPI, structures::hybrid_set::{HybridSet, HybridSetOps}}, types::{DEFAULT_INDEXABLE_ARC, DEFAULT_PY_INDEXABLE_ARC, StrId}, value::PyValue};
 use crate::index::Indexable;
 
+// ids decoded from a bitmap per block when materializing results
+const DECODE_BLOCK: usize = 256;
+
+/// Python handles for every id in `ids` that holds an object, in id order. Vacant slots
+/// share one placeholder and are never handed out. The bitmap is decoded a block of
+/// ids at a time by croaring rather than stepped through one id per iterator call, and
+/// the result is sized up front so handing it to `PyList::new` fills a presized list.
+pub fn collect_py_refs(py: Python, items: &[StoredItem], ids: &Bitmap) -> Vec<Py<Indexable>> {
+    let mut out = Vec::with_capacity(ids.cardinality() as usize);
+    let mut block = [0u32; DECODE_BLOCK];
+    let mut iter = ids.iter();
+    loop {
+        let n = iter.next_many(&mut block);
+        if n == 0 {
+            break;
+        }
+        out.extend(block[..n].iter()
+            .map(|id| &items[*id as usize])
+            .filter(|item| !item.is_vacant())
+            .map(|item| item.get_py_ref(py)));
+    }
+    out
+}
 
 #[derive(Clone, Debug)]
 pub struct StoredItem{
@@ -41,6 +65,12 @@ impl<'py> StoredItem {
     pub fn borrow_py_ref(&self, py: Python<'py>) -> PyRef<'py, Indexable> {
         self.py_item.bind(py).borrow()
     }
+
+    // slots left behind by removed objects hold the shared default handle
+    #[inline(always)]
+    pub fn is_vacant(&self) -> bool {
+        Arc::ptr_eq(&self.py_item, &DEFAULT_PY_INDEXABLE_ARC)
+    }
 }
 
 impl Default for StoredItem {
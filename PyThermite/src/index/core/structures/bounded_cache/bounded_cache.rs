@@ -0,0 +1,78 @@
+use std::{borrow::Borrow, hash::Hash, mem};
+
+use rustc_hash::FxHashMap;
+
+/// Size capped memo map with approximate LRU eviction. Entries live in a hot and a cold
+/// generation; once the hot one fills it becomes the cold one and the old cold entries are
+/// dropped. A hit in the cold generation moves the entry back to hot, so keys that keep
+/// being used survive while a one-off burst of new keys only pushes out the idle ones.
+#[derive(Debug)]
+pub struct BoundedCache<K, V> {
+    hot: FxHashMap<K, V>,
+    cold: FxHashMap<K, V>,
+    generation_size: usize,
+}
+
+impl<K: Eq + Hash, V> BoundedCache<K, V> {
+    /// Holds at most `capacity` entries across both generations.
+    pub fn new(capacity: usize) -> Self {
+        Self {
+            hot: FxHashMap::default(),
+            cold: FxHashMap::default(),
+            generation_size: usize::max(capacity / 2, 1),
+        }
+    }
+
+    #[inline(always)]
+    pub fn get<Q>(&mut self, key: &Q) -> Option<&V>
+    where
+        K: Borrow<Q>,
+        Q: Eq + Hash + ?Sized,
+    {
+        if !self.hot.contains_key(key) {
+            let (key, value) = self.cold.remove_entry(key)?;
+            self.insert(key, value);
+        }
+        self.hot.get(key)
+    }
+
+    pub fn insert(&mut self, key: K, value: V) {
+        if self.hot.len() >= self.generation_size {
+            self.cold = mem::take(&mut self.hot);
+        }
+        self.hot.insert(key, value);
+    }
+
+    pub fn len(&self) -> usize {
+        self.hot.len() + self.cold.len()
+    }
+}
+
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn stays_within_capacity() {
+        let mut cache: BoundedCache<u32, u32> = BoundedCache::new(8);
+        for i in 0..100 {
+            cache.insert(i, i * 2);
+        }
+        assert!(cache.len() <= 8);
+        assert_eq!(cache.get(&99), Some(&198));
+        assert_eq!(cache.get(&0), None);
+    }
+
+    #[test]
+    fn used_keys_survive_eviction() {
+        let mut cache: BoundedCache<u32, u32> = BoundedCache::new(8);
+        cache.insert(0, 0);
+        for i in 1..100 {
+            // touching key 0 every round keeps it in a live generation
+            assert_eq!(cache.get(&0), Some(&0));
+            cache.insert(i, i);
+        }
+        assert_eq!(cache.get(&0), Some(&0));
+    }
+}
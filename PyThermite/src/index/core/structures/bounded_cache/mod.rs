@@ -0,0 +1,4 @@
+
+mod bounded_cache;
+
+pub use bounded_cache::BoundedCache;
\ No newline at end of file
@@ -1,184 +1,89 @@
-use std::array;
-
 use croaring::Bitmap;
+use rustc_hash::FxHashMap;
+use smallvec::SmallVec;
 
+// most objects hang off a single parent, so an edge list rarely leaves the inline slots
+type Edges = SmallVec<[u32; 2]>;
 
-#[derive(Debug, Clone)]
-pub struct NibbleIndexU32  {
-    data: [Bitmap; 16],
-}
-
-impl NibbleIndexU32  {
-    pub fn new() -> Self {
-        Self {
-            data: array::from_fn(|_| Bitmap::new()),
-        }
-    }
-
-    #[inline(always)]
-    unsafe fn add(&mut self, nibble: usize, id: u32) {
-        let bitmap = self.data.get_unchecked_mut(nibble);
-        bitmap.add(id);
-    }
-
-    #[inline(always)]
-    unsafe fn remove(&mut self, nibble: usize, id: u32) {
-        let bitmap = self.data.get_unchecked_mut(nibble);
-        bitmap.remove(id);
-    }
-
-    #[inline(always)]
-    fn all_into(&self, into: &mut Bitmap) {
-        for bm in self.data.iter() {
-            into.or_inplace(bm);
-        }
-    }
-
-    #[inline(always)]
-    unsafe fn and_inplace(&self, nibble: usize, bm: &mut Bitmap) {
-        bm.and_inplace(self.data.get_unchecked(nibble));
-    }
-
-    #[inline(always)]
-    fn contains(&self, id: u32) -> bool {
-        for bm in self.data.iter() {
-            if bm.contains(id) {
-                return true;
-            }
-        }
-        false
-    }
-}
-
-impl Default for NibbleIndexU32  {
-    fn default() -> Self {
-        Self::new()
-    }
-}
-
+/// Many to many map between forward (parent) and reverse (child) ids. Both directions
+/// are kept as direct adjacency lists, so mapping a set of ids across is a walk over
+/// the ids and their edges rather than a pass over every stored relation per id.
 #[derive(Debug, Clone, Default)]
 pub struct M2MU32 {
-    forward_maps: [NibbleIndexU32; 8],
-    reverse_maps: [NibbleIndexU32; 8],
+    forward_edges: FxHashMap<u32, Edges>,
+    reverse_edges: FxHashMap<u32, Edges>,
 }
 
 impl M2MU32 {
     pub fn new() -> Self {
-        Self {
-            forward_maps: array::from_fn(|_| NibbleIndexU32  {
-                data: Default::default(),
-            }),
-            reverse_maps: array::from_fn(|_| NibbleIndexU32  {
-                data: Default::default(),
-            }),
-        }
+        Self::default()
     }
 
     #[inline(always)]
     pub fn contains(&self, id: u32) -> bool {
-        self.forward_maps[0].contains(id)
+        self.reverse_edges.contains_key(&id)
     }
 
     #[inline(always)]
-    fn all_forward(&self) -> Bitmap {
-        let mut res = Bitmap::new();
-        for fm in self.forward_maps.iter() {
-            fm.all_into(&mut res);
+    fn link(edges: &mut FxHashMap<u32, Edges>, from: u32, to: u32) {
+        let list = edges.entry(from).or_default();
+        if !list.contains(&to) {
+            list.push(to);
         }
-        res
     }
 
     #[inline(always)]
-    fn all_reverse(&self) -> Bitmap {
-        let mut res = Bitmap::new();
-        for rm in self.reverse_maps.iter() {
-            rm.all_into(&mut res);
+    fn unlink(edges: &mut FxHashMap<u32, Edges>, from: u32, to: u32) {
+        if let Some(list) = edges.get_mut(&from) {
+            list.retain(|id| *id != to);
+            if list.is_empty() {
+                edges.remove(&from);
+            }
         }
-        res
     }
 
     #[inline(always)]
-    pub fn add(&mut self, forward: u32, reverse: u32) {
-        for i in 0..8 {
-            let forward_n = ((forward >> (i * 4)) & 0xF) as usize;
-            let reverse_n = ((reverse >> (i * 4)) & 0xF) as usize;
-
-            unsafe {
-                self.forward_maps.get_unchecked_mut(i).add(forward_n, reverse);
-                self.reverse_maps.get_unchecked_mut(i).add(reverse_n, forward);
+    fn collect_many(edges: &FxHashMap<u32, Edges>, ids: &Bitmap) -> Bitmap {
+        let mut buf: Vec<u32> = Vec::new();
+        for id in ids.iter() {
+            if let Some(list) = edges.get(&id) {
+                buf.extend_from_slice(list);
             }
         }
+        buf.sort_unstable();
+        Bitmap::of(&buf)
     }
 
-    pub fn remove(&mut self, forward: u32, reverse: u32) {
-        for i in 0..8 {
-            let forward_n = ((forward >> (i * 4)) & 0xF) as usize;
-            let reverse_n = ((reverse >> (i * 4)) & 0xF) as usize;
+    #[inline(always)]
+    pub fn add(&mut self, forward: u32, reverse: u32) {
+        Self::link(&mut self.forward_edges, forward, reverse);
+        Self::link(&mut self.reverse_edges, reverse, forward);
+    }
 
-            unsafe {
-                self.forward_maps.get_unchecked_mut(i).remove(forward_n, reverse);
-                self.reverse_maps.get_unchecked_mut(i).remove(reverse_n, forward);
-            }
-        }
+    pub fn remove(&mut self, forward: u32, reverse: u32) {
+        Self::unlink(&mut self.forward_edges, forward, reverse);
+        Self::unlink(&mut self.reverse_edges, reverse, forward);
     }
 
     #[inline(always)]
     pub fn get_for_forward(&self, forward: u32) -> Bitmap {
-        let mut res = self.all_forward();
-        for i in 0..8 {
-            let forward_n = ((forward >> (i * 4)) & 0xF) as usize;
-            unsafe {
-                self.forward_maps[i].and_inplace(forward_n, &mut res);
-            }
-        }
-        res
+        self.forward_edges.get(&forward).map_or_else(Bitmap::new, |list| Bitmap::of(list))
     }
 
     #[inline(always)]
     pub fn get_for_reverse(&self, reverse: u32) -> Bitmap {
-        let mut res = self.all_reverse();
-        for i in 0..8 {
-            let reverse_n = ((reverse >> (i * 4)) & 0xF) as usize;
-            unsafe {
-                self.reverse_maps[i].and_inplace(reverse_n, &mut res);
-            }
-        }
-        res
+        self.reverse_edges.get(&reverse).map_or_else(Bitmap::new, |list| Bitmap::of(list))
     }
 
     // bitmap ops
     #[inline]
     pub fn get_for_forward_many(&self, forward_bitmap: &Bitmap) -> Bitmap {
-        let all = self.all_forward();
-        let mut res = Bitmap::new();
-        for forward in forward_bitmap.iter() {
-            let mut tmp = all.clone();
-            for i in 0..8 {
-                let forward_n = ((forward >> (i * 4)) & 0xF) as usize;
-                unsafe {
-                    self.forward_maps[i].and_inplace(forward_n, &mut tmp);
-                }
-            }
-            res.or_inplace(&tmp);
-        }
-        res
+        Self::collect_many(&self.forward_edges, forward_bitmap)
     }
 
     #[inline]
     pub fn get_for_reverse_many(&self, reverse_bitmap: &Bitmap) -> Bitmap {
-        let all = self.all_reverse();
-        let mut res = Bitmap::new();
-        for reverse in reverse_bitmap.iter() {
-            let mut tmp = all.clone();
-            for i in 0..8 {
-                let reverse_n = ((reverse >> (i * 4)) & 0xF) as usize;
-                unsafe {
-                    self.reverse_maps[i].and_inplace(reverse_n, &mut tmp);
-                }
-            }
-            res.or_inplace(&tmp);
-        }
-        res
+        Self::collect_many(&self.reverse_edges, reverse_bitmap)
     }
 }
 
@@ -343,4 +248,17 @@ mod tests {
         assert!(res.contains(11));
         assert_eq!(res.cardinality(), 1);
     }
-}
\ No newline at end of file
+
+    #[test]
+    fn duplicate_add_is_idempotent() {
+        let mut m = M2MU32::new();
+
+        m.add(1, 10);
+        m.add(1, 10);
+        m.remove(1, 10);
+
+        assert!(m.get_for_forward(1).is_empty());
+        assert!(m.get_for_reverse(10).is_empty());
+        assert!(!m.contains(10));
+    }
+}
@@ -7,4 +7,5 @@ pub mod ordered_bitmap;
 pub mod composite_key;
 pub mod boolean_bitmap;
 pub mod m2m;
-pub mod buffered_bitmap;
\ No newline at end of file
+pub mod buffered_bitmap;
+pub mod bounded_cache;
\ No newline at end of file
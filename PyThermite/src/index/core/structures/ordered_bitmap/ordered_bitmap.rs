@@ -6,6 +6,9 @@ use crate::index::core::structures::buffered_bitmap::BufferedBitmap;
 
 pub(crate) const BIT_LENGTH: usize = 76; // do not use the whole 128
 const BUFF_SIZE: usize = 64;
+// up to this many candidates a range check reads each id's value back out of the slices
+// instead of running the full slice walk over bitmaps
+pub(crate) const DENSE_PROBE_LIMIT: u64 = 256;
 
 thread_local! {
     pub(crate) static TMP_BITMAP: RefCell<Bitmap> = RefCell::new(Bitmap::new());
@@ -38,6 +41,11 @@ impl NumericBitIndex {
         }
     }
 
+    #[inline(always)]
+    pub fn add_many(&mut self, byte_id: usize, ids: &[u32]) {
+        self.bits[byte_id].add_many(ids)
+    }
+
     #[inline(always)]
     pub fn remove(&mut self, byte_id: usize, id: u32) {
         self.bits[byte_id].remove(id)
@@ -76,6 +84,9 @@ impl Default for NumericBitIndex {
 #[derive(Debug)]
 pub struct NumericalBitmap {
     pub(crate) bits: [NumericBitIndex; BIT_LENGTH],
+    // every value ever stored lies within these, removals leave them as loose bounds
+    min_value: u128,
+    max_value: u128,
 }
 
 impl NumericalBitmap {
@@ -83,8 +94,68 @@ impl NumericalBitmap {
         Self::default()
     }
 
+    #[inline(always)]
+    fn widen_bounds(&mut self, value: u128) {
+        self.min_value = self.min_value.min(value);
+        self.max_value = self.max_value.max(value);
+    }
+
+    /// Settles the range [low, high] from the column bounds alone when they can: nothing
+    /// when no stored value can fall inside, every indexed candidate when all of them must.
+    #[inline(always)]
+    pub(crate) fn range_from_bounds(&self, low: u128, high: u128, candidates: &Bitmap) -> Option<Bitmap> {
+        if low > high || high < self.min_value || low > self.max_value {
+            return Some(Bitmap::new());
+        }
+        if low <= self.min_value && self.max_value <= high {
+            let mut res = self.bits[0].all();
+            res.and_inplace(candidates);
+            return Some(res);
+        }
+        None
+    }
+
+    // the value stored for `id`, rebuilt from one membership test per slice
+    #[inline(always)]
+    fn value_of(&self, id: u32) -> Option<u128> {
+        // every stored id sits on one side of each slice, the first tells if it is stored at all
+        let first = &self.bits[0];
+        if !first.contains(0).contains(id) && !first.contains(1).contains(id) {
+            return None;
+        }
+        let mut value = 0u128;
+        for bit in 0..BIT_LENGTH {
+            value |= (self.bits[bit].contains(1).contains(id) as u128) << bit;
+        }
+        Some(value)
+    }
+
+    /// Ids of `candidates` whose value passes `keep`, each value read back from the slices.
+    #[inline(always)]
+    pub(crate) fn probe_from_valid<F: Fn(u128) -> bool>(&self, candidates: &Bitmap, keep: F) -> Bitmap {
+        let hits: Vec<u32> = candidates.iter()
+            .filter(|id| self.value_of(*id).map_or(false, |v| keep(v)))
+            .collect();
+        Bitmap::of(&hits)
+    }
+
+    /// Ids of `candidates` holding any of `wanted` (sorted, deduplicated), or `None`
+    /// when there are too many candidates for the column to beat an exact walk per value.
+    pub fn get_in_from_valid(&self, wanted: &[u128], candidates: &Bitmap) -> Option<Bitmap> {
+        if candidates.cardinality() > DENSE_PROBE_LIMIT {
+            return None;
+        }
+        // a short list is compared in full without branching on each hit, longer ones are searched
+        Some(if wanted.len() <= 8 {
+            self.probe_from_valid(candidates, |v| wanted.iter().fold(false, |hit, w| hit | (*w == v)))
+        } else {
+            self.probe_from_valid(candidates, |v| wanted.binary_search(&v).is_ok())
+        })
+    }
+
     #[inline(always)]
     pub fn add(&mut self, value: u128, id: u32) {
+        self.widen_bounds(value);
         for bit in 0..BIT_LENGTH {
             let v = (value >> bit) as usize & 1;
             unsafe {
@@ -95,6 +166,7 @@ impl NumericalBitmap {
 
     #[inline(always)]
     pub fn add_delayed(&mut self, value: u128, id: u32) {
+        self.widen_bounds(value);
         for bit in 0..BIT_LENGTH {
             let v = (value >> bit) as usize & 1;
             unsafe{
@@ -103,6 +175,30 @@ impl NumericalBitmap {
         }
     }
 
+    /// Adds a column of values at once, `values[i]` belonging to `ids[i]`.
+    pub fn add_many(&mut self, values: &[u128], ids: &[u32]) {
+        debug_assert_eq!(values.len(), ids.len());
+        for value in values {
+            self.widen_bounds(*value);
+        }
+        // walk the column once per slice rather than every slice once per value, each
+        // slice then gets two sorted runs of ids instead of scattered single adds
+        let mut split: [Vec<u32>; 2] = [Vec::with_capacity(ids.len()), Vec::with_capacity(ids.len())];
+        for bit in 0..BIT_LENGTH {
+            split[0].clear();
+            split[1].clear();
+            for (value, id) in values.iter().zip(ids) {
+                let v = (value >> bit) as usize & 1;
+                unsafe { split.get_unchecked_mut(v).push(*id); }
+            }
+            for byte_id in 0..2 {
+                if !split[byte_id].is_empty() {
+                    self.bits[bit].add_many(byte_id, &split[byte_id]);
+                }
+            }
+        }
+    }
+
     #[inline(always)]
     pub fn remove(&mut self, value: u128, id: u32) {
         for bit in 0..BIT_LENGTH {
@@ -113,12 +209,12 @@ impl NumericalBitmap {
 
     #[inline(always)]
     pub fn keep_only(&mut self, valid: &Bitmap) {
+        // trim in place, keeps the existing containers rather than rebuilding each one
         for bit in 0..BIT_LENGTH {
             for byte_id in 0..2 {
-                let mut tmp = BufferedBitmap::new();
-                tmp.or_inplace(self.bits[bit].contains(byte_id));
-                tmp.and_inplace(valid);
-                self.bits[bit].bits[byte_id] = tmp;
+                let bitmap = &mut self.bits[bit].bits[byte_id];
+                bitmap.flush();
+                bitmap.and_inplace(valid);
             }
         }
     }
@@ -138,6 +234,8 @@ impl NumericalBitmap {
     }
 
     pub fn merge(&mut self, other: &NumericalBitmap) {
+        self.min_value = self.min_value.min(other.min_value);
+        self.max_value = self.max_value.max(other.max_value);
         for (self_bit, other_bit) in self.bits.iter_mut().zip(other.bits.iter()) {
             self_bit.merge(other_bit);
         }
@@ -151,7 +249,16 @@ impl NumericalBitmap {
         out.or_inplace(self.bits[first_bit].contains(first_v));
 
         for bit in 1..BIT_LENGTH {
+            // nothing left to narrow, the remaining slices cannot add ids back
+            if out.is_empty() {
+                return;
+            }
             let v = ((value >> bit) & 1) as usize;
+            // out only holds indexed ids here, so a slice where every id carries the queried
+            // bit cannot narrow it. low cardinality columns leave most slices like this
+            if self.bits[bit].contains(v ^ 1).is_empty() {
+                continue;
+            }
             out.and_inplace(self.bits[bit].contains(v));
         }
     }
@@ -162,6 +269,9 @@ impl Default for NumericalBitmap {
     fn default() -> Self {
         Self {
             bits: std::array::from_fn(|_| NumericBitIndex::default()),
+            // inverted until the first value lands, so an empty column bounds no range
+            min_value: u128::MAX,
+            max_value: 0,
         }
     }
 }
@@ -277,6 +387,113 @@ mod tests {
         assert!(res.contains(99));
     }
 
+    #[test]
+    fn keep_only_trims_ids() {
+        let mut idx = NumericalBitmap::new();
+
+        idx.add(0b1010u128, 1);
+        idx.add(0b1010u128, 2);
+        idx.add_delayed(0b1010u128, 3);
+
+        idx.keep_only(&Bitmap::of(&[2, 3]));
+
+        let res = idx.get_exact(0b1010);
+        assert_eq!(res.cardinality(), 2);
+        assert!(!res.contains(1));
+        assert!(res.contains(2));
+        assert!(res.contains(3));
+    }
+
+    #[test]
+    fn add_many_matches_add() {
+        let values: Vec<u128> = (0..500u128).map(|i| (i * 7919) % 97).collect();
+        let ids: Vec<u32> = (0..500u32).collect();
+
+        let mut single = NumericalBitmap::new();
+        for (value, id) in values.iter().zip(&ids) {
+            single.add(*value, *id);
+        }
+
+        let mut bulk = NumericalBitmap::new();
+        bulk.add_many(&values, &ids);
+
+        for value in 0..100u128 {
+            assert_eq!(single.get_exact(value), bulk.get_exact(value));
+        }
+    }
+
+    #[test]
+    fn dense_probe_matches_slice_walk() {
+        let mut idx = NumericalBitmap::new();
+        for id in 0..1000u32 {
+            idx.add((id as u128 * 7919) % 500, id);
+        }
+        idx.remove((10 * 7919) % 500, 10);
+
+        // small enough to be probed, the full id range is walked slice by slice
+        let candidates = Bitmap::of(&(0..1000u32).step_by(5).collect::<Vec<_>>());
+        assert!(candidates.cardinality() <= DENSE_PROBE_LIMIT);
+
+        assert_eq!(idx.get_gt_from_valid(250, &candidates), idx.get_gt(250).and(&candidates));
+        assert_eq!(idx.get_lte_from_valid(250, &candidates), idx.get_lte(250).and(&candidates));
+        assert_eq!(idx.get_bt_from_valid(100, 300, &candidates), idx.get_bt(100, 300).and(&candidates));
+        assert!(!idx.get_gte_from_valid(0, &candidates).contains(10));
+    }
+
+    #[test]
+    fn probe_with_high_ids_after_trim_and_merge() {
+        let base = 5_000_000u32;
+        let mut a = NumericalBitmap::new();
+        let mut b = NumericalBitmap::new();
+        for i in 0..10u32 {
+            a.add(i as u128, base + i);
+            b.add(100 + i as u128, base + 100 + i);
+        }
+        a.keep_only(&Bitmap::from_range(base + 5..base + 10));
+        a.merge(&b);
+
+        let candidates = Bitmap::from_range(base..base + 200);
+        let expected: Vec<u32> = (base + 5..base + 10).chain(base + 100..base + 104).collect();
+        assert_eq!(a.get_lt_from_valid(104, &candidates), Bitmap::of(&expected));
+        assert_eq!(a.get_in_from_valid(&[2, 7, 103], &candidates), Some(Bitmap::of(&[base + 7, base + 103])));
+    }
+
+    #[test]
+    fn bounds_settle_covering_and_disjoint_ranges() {
+        let mut idx = NumericalBitmap::new();
+        for id in 0..1000u32 {
+            idx.add(100 + id as u128, id);
+        }
+        let candidates = Bitmap::from_range(0..2000);
+
+        assert_eq!(idx.get_gt_from_valid(50, &candidates), Bitmap::from_range(0..1000));
+        assert!(idx.get_gt_from_valid(1099, &candidates).is_empty());
+        assert!(idx.get_lt_from_valid(100, &candidates).is_empty());
+        assert_eq!(idx.get_bt_from_valid(0, 5000, &candidates), Bitmap::from_range(0..1000));
+        // a partial overlap still walks the slices
+        assert_eq!(idx.get_lte_from_valid(149, &candidates), Bitmap::from_range(0..50));
+        assert!(NumericalBitmap::new().get_gte_from_valid(0, &candidates).is_empty());
+    }
+
+    #[test]
+    fn in_probe_matches_exact_union() {
+        let mut idx = NumericalBitmap::new();
+        for id in 0..1000u32 {
+            idx.add(id as u128 % 50, id);
+        }
+        let candidates = Bitmap::of(&(0..1000u32).step_by(7).collect::<Vec<_>>());
+
+        for wanted in [vec![3u128, 20, 41], (0..20u128).collect::<Vec<_>>()] {
+            let mut expected = Bitmap::new();
+            for v in wanted.iter() {
+                expected.or_inplace(&idx.get_exact(*v));
+            }
+            expected.and_inplace(&candidates);
+            assert_eq!(idx.get_in_from_valid(&wanted, &candidates), Some(expected));
+        }
+        assert!(idx.get_in_from_valid(&[1], &Bitmap::from_range(0..1000)).is_none());
+    }
+
     #[test]
     fn query_nonexistent_value() {
         let mut idx = NumericalBitmap::new();
@@ -307,4 +524,20 @@ mod tests {
         assert!(r3.contains(3));
     }
 
-}
\ No newline at end of file
+    #[test]
+    fn low_cardinality_exact() {
+        let mut idx = NumericalBitmap::new();
+
+        for id in 0..30u32 {
+            idx.add((id % 3) as u128, id);
+        }
+
+        let res = idx.get_exact(2);
+        assert_eq!(res.cardinality(), 10);
+        assert!(res.iter().all(|id| id % 3 == 2));
+
+        // a bit no stored value carries still narrows to nothing
+        assert!(idx.get_exact(1 << 40).is_empty());
+    }
+
+}
@@ -1,6 +1,6 @@
 use croaring::Bitmap;
 
-use crate::index::core::structures::ordered_bitmap::ordered_bitmap::{NumericalBitmap};
+use crate::index::core::structures::ordered_bitmap::ordered_bitmap::{BIT_LENGTH, DENSE_PROBE_LIMIT, TMP_BITMAP, NumericalBitmap};
 
 
 impl NumericalBitmap {
@@ -12,25 +12,76 @@ impl NumericalBitmap {
             return;
         }
 
-        let mut lt = Bitmap::new();
-        let mut gt = Bitmap::new();
-
-        self.get_lte_into(high, &mut lt, all_valid);
-        self.get_gte_into(low, &mut gt, all_valid);
-
-//        std::thread::scope(|s| {
-//            s.spawn(|| {
-//                self.get_lte_into(high, &mut lt);
-//            });
-//
-//            s.spawn(|| {
-//                self.get_gte_into(low, &mut gt);
-//            });
-//        });
-
-        // Final intersection (single-threaded)
-        lt.and_inplace(&gt);
-        out.or_inplace(&lt);
+        // both bounds are walked in a single pass. while they share a prefix one set
+        // is narrowed for both, after they split the lower side runs the gte walk and
+        // the upper side the lte walk, so no separate lte / gte results are intersected
+        TMP_BITMAP.with(|scratch| {
+            let mut tmp = scratch.borrow_mut();
+            let mut prefix_eq = all_valid.clone();
+
+            let mut split = None;
+            for bit in (0..BIT_LENGTH).rev() {
+                if prefix_eq.is_empty() {
+                    return;
+                }
+                let v = ((low >> bit) & 1) as usize;
+                if v != ((high >> bit) & 1) as usize {
+                    split = Some(bit);
+                    break;
+                }
+                if bit + 1 < BIT_LENGTH && self.bits[bit].contains(v ^ 1).is_empty() {
+                    continue;
+                }
+                prefix_eq.and_inplace(self.bits[bit].contains(v));
+            }
+
+            // low == high, only the exact matches remain
+            let Some(split) = split else {
+                out.or_inplace(&prefix_eq);
+                return;
+            };
+
+            // low < high so low carries the 0 and high the 1 at the split
+            let mut upper_eq = prefix_eq.and(self.bits[split].contains(1));
+            let mut lower_eq = prefix_eq;
+            lower_eq.and_inplace(self.bits[split].contains(0));
+
+            for bit in (0..split).rev() {
+                if lower_eq.is_empty() && upper_eq.is_empty() {
+                    break;
+                }
+
+                let v = ((low >> bit) & 1) as usize;
+                let mask = self.bits[bit].contains(v ^ 1);
+                if !lower_eq.is_empty() && !mask.is_empty() {
+                    // above low where low has a 0
+                    if v == 0 {
+                        tmp.clear();
+                        tmp.or_inplace(&lower_eq);
+                        tmp.and_inplace(mask);
+                        out.or_inplace(&tmp);
+                    }
+                    lower_eq.and_inplace(self.bits[bit].contains(v));
+                }
+
+                let v = ((high >> bit) & 1) as usize;
+                let mask = self.bits[bit].contains(v ^ 1);
+                if !upper_eq.is_empty() && !mask.is_empty() {
+                    // below high where high has a 1
+                    if v == 1 {
+                        tmp.clear();
+                        tmp.or_inplace(&upper_eq);
+                        tmp.and_inplace(mask);
+                        out.or_inplace(&tmp);
+                    }
+                    upper_eq.and_inplace(self.bits[bit].contains(v));
+                }
+            }
+
+            // both bounds are inclusive
+            out.or_inplace(&lower_eq);
+            out.or_inplace(&upper_eq);
+        })
     }
 
 
@@ -44,6 +95,13 @@ impl NumericalBitmap {
 
     #[inline(always)]
     pub fn get_bt_from_valid(&self, low: u128, high: u128, all_valid: &Bitmap) -> Bitmap {
+        if let Some(res) = self.range_from_bounds(low, high, all_valid) {
+            return res;
+        }
+        // a narrowed candidate set is cheaper to check value by value
+        if all_valid.cardinality() <= DENSE_PROBE_LIMIT {
+            return self.probe_from_valid(all_valid, |v| low <= v && v <= high);
+        }
         let mut res = Bitmap::new();
         self.get_bt_into(low, high, &mut res, all_valid);
         res
@@ -189,6 +247,18 @@ mod tests {
         assert_eq!(bitmap_to_set(&res), expected);
     }
 
+    #[test]
+    fn test_between_from_valid_ignores_unindexed_ids() {
+        let values = (0u128..64).collect::<Vec<_>>();
+        let idx = build_index(&values);
+
+        let all_valid = Bitmap::from_range(0..200);
+        let res = idx.get_bt_from_valid(10, 20, &all_valid);
+
+        assert_eq!(bitmap_to_set(&res), (10u32..=20).collect::<Vec<_>>());
+        assert_eq!(idx.get_bt_from_valid(0, u128::MAX, &all_valid).cardinality(), 64);
+    }
+
     #[test]
     fn test_between_fuzz() {
         let mut rng = StdRng::seed_from_u64(0xDEADBEEF);
@@ -2,7 +2,7 @@ use std::sync::OnceLock;
 
 use croaring::Bitmap;
 
-use crate::index::core::structures::ordered_bitmap::ordered_bitmap::{BIT_LENGTH, TMP_BITMAP, NumericalBitmap};
+use crate::index::core::structures::ordered_bitmap::ordered_bitmap::{BIT_LENGTH, DENSE_PROBE_LIMIT, TMP_BITMAP, NumericalBitmap};
 
 type GetGtFn = unsafe fn(&NumericalBitmap, u128, &mut Bitmap, &Bitmap);
 static GET_GT_FN: OnceLock<GetGtFn> = OnceLock::new();
@@ -15,16 +15,25 @@ macro_rules! define_get_gt_body {
             let mut prefix_eq = $all_valid.clone();
 
             for bit in (0..BIT_LENGTH).rev() {
+                if prefix_eq.is_empty() {
+                    break;
+                }
                 let v = (($value >> bit) & 1) as usize;
+                let mask = $self.bits[bit].contains(v ^ 1);
 
-                // tmp.clone_from(&prefix_eq);
-                tmp.clear();
-                tmp.or_inplace(&prefix_eq);
-                tmp.and_inplace($self.bits[bit].contains(1));
+                // below the top slice prefix_eq only holds indexed ids, so a slice
+                // where every id shares the query bit cannot split it any further
+                if bit + 1 < BIT_LENGTH && mask.is_empty() {
+                    continue;
+                }
 
-                let mask = $self.bits[bit].contains(v ^ 1);
-                tmp.and_inplace(mask);
-                $out.or_inplace(&tmp);
+                // ids with a 1 where the query has a 0 are decided here
+                if v == 0 {
+                    tmp.clear();
+                    tmp.or_inplace(&prefix_eq);
+                    tmp.and_inplace(mask);
+                    $out.or_inplace(&tmp);
+                }
 
                 prefix_eq.and_inplace($self.bits[bit].contains(v));
             }
@@ -39,15 +48,25 @@ macro_rules! define_get_gte_body {
             let mut prefix_eq = $all_valid.clone();
 
             for bit in (0..BIT_LENGTH).rev() {
+                if prefix_eq.is_empty() {
+                    break;
+                }
                 let v = (($value >> bit) & 1) as usize;
+                let mask = $self.bits[bit].contains(v ^ 1);
 
-                tmp.clear();
-                tmp.or_inplace(&prefix_eq);
-                tmp.and_inplace($self.bits[bit].contains(1));
+                // below the top slice prefix_eq only holds indexed ids, so a slice
+                // where every id shares the query bit cannot split it any further
+                if bit + 1 < BIT_LENGTH && mask.is_empty() {
+                    continue;
+                }
 
-                let mask = $self.bits[bit].contains(v ^ 1);
-                tmp.and_inplace(mask);
-                $out.or_inplace(&tmp);
+                // ids with a 1 where the query has a 0 are decided here
+                if v == 0 {
+                    tmp.clear();
+                    tmp.or_inplace(&prefix_eq);
+                    tmp.and_inplace(mask);
+                    $out.or_inplace(&tmp);
+                }
 
                 prefix_eq.and_inplace($self.bits[bit].contains(v));
             }
@@ -166,6 +185,12 @@ impl NumericalBitmap {
 
     #[inline(always)]
     pub fn get_gt_from_valid(&self, value: u128, all_valid: &Bitmap) -> Bitmap {
+        if let Some(res) = self.range_from_bounds(value.saturating_add(1), u128::MAX, all_valid) {
+            return res;
+        }
+        if all_valid.cardinality() <= DENSE_PROBE_LIMIT {
+            return self.probe_from_valid(all_valid, |v| v > value);
+        }
         let mut res = Bitmap::new();
         self.get_gt_into(value, &mut res, all_valid);
         res
@@ -181,6 +206,12 @@ impl NumericalBitmap {
 
     #[inline(always)]
     pub fn get_gte_from_valid(&self, value: u128, all_valid: &Bitmap) -> Bitmap {
+        if let Some(res) = self.range_from_bounds(value, u128::MAX, all_valid) {
+            return res;
+        }
+        if all_valid.cardinality() <= DENSE_PROBE_LIMIT {
+            return self.probe_from_valid(all_valid, |v| v >= value);
+        }
         let mut res = Bitmap::new();
         self.get_gte_into(value, &mut res, all_valid);
         res
@@ -351,4 +382,19 @@ mod tests {
         assert!(out.contains(99));
         assert!(!out.contains(42));
     }
-}
\ No newline at end of file
+
+    #[test]
+    fn gte_from_valid_ignores_unindexed_ids() {
+        let mut idx = NumericalBitmap::new();
+
+        // shared high bits leave most slices constant
+        idx.add(1 << 40, 1);
+        idx.add((1 << 40) + 3, 2);
+
+        let all_valid = Bitmap::of(&[1, 2, 5, 6]);
+        let out = idx.get_gte_from_valid(1 << 40, &all_valid);
+
+        let res = bitmap_to_vec(&out);
+        assert_eq!(res, vec![1, 2]);
+    }
+}
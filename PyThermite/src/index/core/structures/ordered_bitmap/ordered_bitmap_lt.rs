@@ -2,7 +2,7 @@ use std::sync::OnceLock;
 
 use croaring::Bitmap;
 
-use crate::index::core::structures::ordered_bitmap::ordered_bitmap::{BIT_LENGTH, TMP_BITMAP, NumericalBitmap};
+use crate::index::core::structures::ordered_bitmap::ordered_bitmap::{BIT_LENGTH, DENSE_PROBE_LIMIT, TMP_BITMAP, NumericalBitmap};
 
 type GetLtFn = unsafe fn(&NumericalBitmap, u128, &mut Bitmap, &Bitmap);
 static GET_LT_FN: OnceLock<GetLtFn> = OnceLock::new();
@@ -15,15 +15,25 @@ macro_rules! define_get_lt_body {
             let mut prefix_eq = $all_valid.clone();
 
             for bit in (0..BIT_LENGTH).rev() {
+                if prefix_eq.is_empty() {
+                    break;
+                }
                 let v = (($value >> bit) & 1) as usize;
+                let mask = $self.bits[bit].contains(v ^ 1);
 
-                tmp.clear();
-                tmp.or_inplace(&prefix_eq);
-                tmp.and_inplace($self.bits[bit].contains(0));
+                // below the top slice prefix_eq only holds indexed ids, so a slice
+                // where every id shares the query bit cannot split it any further
+                if bit + 1 < BIT_LENGTH && mask.is_empty() {
+                    continue;
+                }
 
-                let mask = $self.bits[bit].contains(v ^ 1);
-                tmp.and_inplace(mask);
-                $out.or_inplace(&tmp);
+                // ids with a 0 where the query has a 1 are decided here
+                if v == 1 {
+                    tmp.clear();
+                    tmp.or_inplace(&prefix_eq);
+                    tmp.and_inplace(mask);
+                    $out.or_inplace(&tmp);
+                }
 
                 prefix_eq.and_inplace($self.bits[bit].contains(v));
             }
@@ -38,15 +48,25 @@ macro_rules! define_get_lte_body {
             let mut prefix_eq = $all_valid.clone();
 
             for bit in (0..BIT_LENGTH).rev() {
+                if prefix_eq.is_empty() {
+                    break;
+                }
                 let v = (($value >> bit) & 1) as usize;
+                let mask = $self.bits[bit].contains(v ^ 1);
 
-                tmp.clear();
-                tmp.or_inplace(&prefix_eq);
-                tmp.and_inplace($self.bits[bit].contains(0));
+                // below the top slice prefix_eq only holds indexed ids, so a slice
+                // where every id shares the query bit cannot split it any further
+                if bit + 1 < BIT_LENGTH && mask.is_empty() {
+                    continue;
+                }
 
-                let mask = $self.bits[bit].contains(v ^ 1);
-                tmp.and_inplace(mask);
-                $out.or_inplace(&tmp);
+                // ids with a 0 where the query has a 1 are decided here
+                if v == 1 {
+                    tmp.clear();
+                    tmp.or_inplace(&prefix_eq);
+                    tmp.and_inplace(mask);
+                    $out.or_inplace(&tmp);
+                }
 
                 prefix_eq.and_inplace($self.bits[bit].contains(v));
             }
@@ -165,6 +185,15 @@ impl NumericalBitmap {
 
     #[inline(always)]
     pub fn get_lt_from_valid(&self, value: u128, all_valid: &Bitmap) -> Bitmap {
+        if value == 0 {
+            return Bitmap::new();
+        }
+        if let Some(res) = self.range_from_bounds(0, value - 1, all_valid) {
+            return res;
+        }
+        if all_valid.cardinality() <= DENSE_PROBE_LIMIT {
+            return self.probe_from_valid(all_valid, |v| v < value);
+        }
         let mut res = Bitmap::new();
         self.get_lt_into(value, &mut res, all_valid);
         res
@@ -180,6 +209,12 @@ impl NumericalBitmap {
 
     #[inline(always)]
     pub fn get_lte_from_valid(&self, value: u128, all_valid: &Bitmap) -> Bitmap {
+        if let Some(res) = self.range_from_bounds(0, value, all_valid) {
+            return res;
+        }
+        if all_valid.cardinality() <= DENSE_PROBE_LIMIT {
+            return self.probe_from_valid(all_valid, |v| v <= value);
+        }
         let mut res = Bitmap::new();
         self.get_lte_into(value, &mut res, all_valid);
         res
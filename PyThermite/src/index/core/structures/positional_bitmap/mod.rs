@@ -1,4 +1,5 @@
 
 mod positional_bitmap;
+mod str_dictionary;
 
 pub use positional_bitmap::PositionalBitmap;
\ No newline at end of file
@@ -1,6 +1,7 @@
 use croaring::Bitmap;
 
 use crate::index::core::structures::buffered_bitmap::BufferedBitmap;
+use crate::index::core::structures::positional_bitmap::str_dictionary::StrDictionary;
 
 const BUFF_SIZE: usize = 32;
 
@@ -35,6 +36,16 @@ impl CharacterMap {
         }
     }
 
+    #[inline(always)]
+    pub fn add_many(&mut self, byte_id: u8, ids: &[u32], is_boundry: bool) {
+        if is_boundry {
+            self.boundry_bytes.add_many(ids);
+        }
+        unsafe {
+            self.maps_u8.get_unchecked_mut(byte_id as usize).add_many(ids)
+        }
+    }
+
     pub fn keep_only(&mut self, ids: &Bitmap) {
         self.boundry_bytes.and_inplace(ids);
         for byte_id in 0..256 {
@@ -100,6 +111,8 @@ impl Default for CharacterMap {
 pub struct PositionalBitmap {
     map: Vec<CharacterMap>,
     empty: BufferedBitmap<BUFF_SIZE>,
+    // answers exact matches while the column has few distinct values
+    dictionary: StrDictionary,
 }
 
 impl PositionalBitmap {
@@ -107,11 +120,13 @@ impl PositionalBitmap {
         Self {
             map: Vec::new(),
             empty: BufferedBitmap::new(),
+            dictionary: StrDictionary::new(),
         }
     }
 
     #[inline(always)]
     pub fn add(&mut self, s: &str, id: u32) {
+        self.dictionary.add(s, id);
         let bytes = s.as_bytes();
         self.ensure_size(bytes);
         let start = self.get_start(bytes);
@@ -128,6 +143,7 @@ impl PositionalBitmap {
 
     #[inline(always)]
     pub fn add_delayed(&mut self, s: &str, id: u32) {
+        self.dictionary.add(s, id);
         let bytes = s.as_bytes();
         self.ensure_size(bytes);
         let start = self.get_start(bytes);
@@ -142,8 +158,27 @@ impl PositionalBitmap {
         }
     }
 
+    /// Adds every id in `ids` under the same string, one bitmap op per position.
+    #[inline(always)]
+    pub fn add_many(&mut self, s: &str, ids: &[u32]) {
+        self.dictionary.add_many(s, ids);
+        let bytes = s.as_bytes();
+        self.ensure_size(bytes);
+        let start = self.get_start(bytes);
+        match bytes.len() {
+            0 => self.empty.add_many(ids),
+            _ => {
+                for i in 0..bytes.len() {
+                    let is_boundry = i == 0 || i == bytes.len() - 1;
+                    self.map[i + start].add_many(bytes[i], ids, is_boundry);
+                }
+            }
+        }
+    }
+
     #[inline(always)]
     pub fn remove(&mut self, s: &str, id: u32) {
+        self.dictionary.remove(s, id);
         let bytes = s.as_bytes();
         let start = ((self.map.len() / 2) - (bytes.len() / 2)).saturating_sub(1);
         match bytes.len() {
@@ -162,6 +197,7 @@ impl PositionalBitmap {
             cm.keep_only(ids);
         }
         self.empty.and_inplace(ids);
+        self.dictionary.keep_only(ids);
     }
 
     #[inline(always)]
@@ -174,8 +210,18 @@ impl PositionalBitmap {
         res
     }
 
+    // exact match count without building the match, only known while the column is dictionary encoded
+    #[inline(always)]
+    pub fn exact_count(&self, chars: &str) -> Option<u64> {
+        self.dictionary.count(chars)
+    }
+
     #[inline(always)]
     pub fn get_exact(&self, chars: &str) -> Bitmap {
+        if let Some(res) = self.dictionary.get_exact(chars) {
+            return res;
+        }
+
         let mut res = Bitmap::new();
         let bytes = chars.as_bytes();
         if bytes.len() > self.map.len() {
@@ -191,6 +237,9 @@ impl PositionalBitmap {
         res.and_inplace(self.map[start].get_boundry_bytes());
 
         for i in 1..bytes.len() {
+            if res.is_empty() {
+                return res;
+            }
             res.and_inplace(self.map[i + start].contains(bytes[i]));
         }
 
@@ -215,6 +264,9 @@ impl PositionalBitmap {
             inner_res.and_inplace(byte_map.contains(bytes[0]));
 
             for inner_pos in 1..bytes.len() {
+                if inner_res.is_empty() {
+                    break;
+                }
                 inner_res.and_inplace(&self.map[pos + inner_pos].contains(bytes[inner_pos]));
             }
 
@@ -242,6 +294,9 @@ impl PositionalBitmap {
             inner_res.and_inplace(byte_map.contains(bytes[max_byte_index]));
 
             for inner_pos in (0..max_byte_index).rev() {
+                if inner_res.is_empty() {
+                    break;
+                }
                 let map_position = pos + inner_pos - max_byte_index;
                 inner_res.and_inplace(&self.map[map_position].contains(bytes[inner_pos]));
             }
@@ -268,6 +323,9 @@ impl PositionalBitmap {
             inner_res.or_inplace(byte_map.contains(bytes[0]));
 
             for inner in 1..bytes.len() {
+                if inner_res.is_empty() {
+                    break;
+                }
                 inner_res.and_inplace(&self.map[pos + inner].contains(bytes[inner]));
             }
 
@@ -284,6 +342,7 @@ impl PositionalBitmap {
         for (self_cm, other_cm) in self.map.iter_mut().zip(other.map.iter()) {
             self_cm.merge(other_cm);
         }
+        self.dictionary.merge(&other.dictionary);
     }
 
     pub fn flush(&mut self) {
@@ -339,6 +398,20 @@ mod tests {
         assert!(!res.contains(2));
     }
 
+    #[test]
+    fn add_many_matches_add() {
+        let mut pb = PositionalBitmap::new();
+        pb.add_many("ab", &[1, 4, 7]);
+        pb.add_many("abcdef", &[2, 5]);
+        pb.add_many("", &[3]);
+
+        assert_eq!(pb.get_exact("ab").iter().collect::<Vec<_>>(), vec![1, 4, 7]);
+        assert_eq!(pb.get_exact("abcdef").iter().collect::<Vec<_>>(), vec![2, 5]);
+        assert_eq!(pb.get_exact("").iter().collect::<Vec<_>>(), vec![3]);
+        assert_eq!(pb.starts_with("ab").cardinality(), 5);
+        assert_eq!(pb.ends_with("ef").iter().collect::<Vec<_>>(), vec![2, 5]);
+    }
+
     #[test]
     fn test_add_and_starts_with() {
         let mut pb = PositionalBitmap::new();
@@ -0,0 +1,204 @@
+use croaring::Bitmap;
+use rustc_hash::FxHashMap;
+use smol_str::SmolStr;
+
+// past this many live distinct values the positional maps are cheaper to keep than a posting per value
+pub(crate) const DICTIONARY_LIMIT: usize = 256;
+
+/// Dictionary encoding for low cardinality string columns. Every distinct string gets a
+/// small code and a posting bitmap, so an exact match is one hash lookup instead of an
+/// AND per byte position. A code whose posting empties is freed for the next new string,
+/// so only live values count. Once a column holds more than `DICTIONARY_LIMIT` of them at
+/// once the dictionary is dropped for good and lookups fall back to the positional maps.
+#[derive(Debug, Clone, Default)]
+pub(crate) struct StrDictionary {
+    codes: FxHashMap<SmolStr, u16>,
+    postings: Vec<Bitmap>,
+    // the string behind each code, None while the code sits in `free`
+    strings: Vec<Option<SmolStr>>,
+    free: Vec<u16>,
+    overflowed: bool,
+}
+
+impl StrDictionary {
+    pub fn new() -> Self {
+        Self::default()
+    }
+
+    #[inline(always)]
+    fn code_for(&mut self, s: &str) -> Option<u16> {
+        if self.overflowed {
+            return None;
+        }
+        if let Some(code) = self.codes.get(s) {
+            return Some(*code);
+        }
+        let s = SmolStr::new(s);
+        if let Some(code) = self.free.pop() {
+            self.codes.insert(s.clone(), code);
+            self.strings[code as usize] = Some(s);
+            return Some(code);
+        }
+        if self.postings.len() >= DICTIONARY_LIMIT {
+            self.overflow();
+            return None;
+        }
+        let code = self.postings.len() as u16;
+        self.codes.insert(s.clone(), code);
+        self.postings.push(Bitmap::new());
+        self.strings.push(Some(s));
+        Some(code)
+    }
+
+    // hands the code of an emptied posting back for reuse
+    fn release(&mut self, code: u16) {
+        if let Some(s) = self.strings[code as usize].take() {
+            self.codes.remove(&s);
+            self.free.push(code);
+        }
+    }
+
+    fn overflow(&mut self) {
+        self.overflowed = true;
+        self.codes = FxHashMap::default();
+        self.postings = Vec::new();
+        self.strings = Vec::new();
+        self.free = Vec::new();
+    }
+
+    #[inline(always)]
+    pub fn add(&mut self, s: &str, id: u32) {
+        if let Some(code) = self.code_for(s) {
+            self.postings[code as usize].add(id);
+        }
+    }
+
+    #[inline(always)]
+    pub fn add_many(&mut self, s: &str, ids: &[u32]) {
+        if let Some(code) = self.code_for(s) {
+            self.postings[code as usize].add_many(ids);
+        }
+    }
+
+    #[inline(always)]
+    pub fn remove(&mut self, s: &str, id: u32) {
+        if let Some(code) = self.codes.get(s).copied() {
+            let posting = &mut self.postings[code as usize];
+            posting.remove(id);
+            if posting.is_empty() {
+                self.release(code);
+            }
+        }
+    }
+
+    pub fn keep_only(&mut self, ids: &Bitmap) {
+        for code in 0..self.postings.len() {
+            let posting = &mut self.postings[code];
+            posting.and_inplace(ids);
+            if posting.is_empty() {
+                self.release(code as u16);
+            }
+        }
+    }
+
+    pub fn merge(&mut self, other: &StrDictionary) {
+        if other.overflowed {
+            self.overflow();
+            return;
+        }
+        for (s, code) in other.codes.iter() {
+            match self.code_for(s) {
+                Some(self_code) => self.postings[self_code as usize].or_inplace(&other.postings[*code as usize]),
+                None => return,
+            }
+        }
+    }
+
+    /// `None` once the dictionary has overflowed and can no longer answer.
+    #[inline(always)]
+    pub fn get_exact(&self, s: &str) -> Option<Bitmap> {
+        if self.overflowed {
+            return None;
+        }
+        Some(self.codes.get(s).map_or_else(Bitmap::new, |code| self.postings[*code as usize].clone()))
+    }
+
+    /// Posting size for `s`, `None` once the dictionary has overflowed.
+    #[inline(always)]
+    pub fn count(&self, s: &str) -> Option<u64> {
+        if self.overflowed {
+            return None;
+        }
+        Some(self.codes.get(s).map_or(0, |code| self.postings[*code as usize].cardinality()))
+    }
+}
+
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn exact_lookup_by_code() {
+        let mut dict = StrDictionary::new();
+        dict.add("US", 1);
+        dict.add_many("CA", &[2, 3]);
+        dict.add("US", 4);
+        dict.remove("US", 1);
+
+        assert_eq!(dict.get_exact("US").unwrap().iter().collect::<Vec<_>>(), vec![4]);
+        assert_eq!(dict.get_exact("CA").unwrap().iter().collect::<Vec<_>>(), vec![2, 3]);
+        assert!(dict.get_exact("MX").unwrap().is_empty());
+        assert_eq!(dict.count("CA"), Some(2));
+        assert_eq!(dict.count("MX"), Some(0));
+    }
+
+    #[test]
+    fn overflow_gives_up() {
+        let mut dict = StrDictionary::new();
+        for id in 0..=DICTIONARY_LIMIT as u32 {
+            dict.add(&format!("value_{id}"), id);
+        }
+        assert!(dict.get_exact("value_0").is_none());
+        assert!(dict.count("value_0").is_none());
+
+        // stays off even for values it used to know
+        dict.add("value_0", 1000);
+        assert!(dict.get_exact("value_0").is_none());
+    }
+
+    #[test]
+    fn emptied_codes_are_reused() {
+        let mut dict = StrDictionary::new();
+        dict.add("kept", 0);
+        // far more distinct values over time than the limit, only a couple live at once
+        for id in 1..=(DICTIONARY_LIMIT as u32 * 4) {
+            dict.add(&format!("value_{id}"), id);
+            dict.remove(&format!("value_{id}"), id);
+        }
+        dict.add_many("a", &[1, 2]);
+        dict.keep_only(&Bitmap::of(&[0, 2]));
+
+        assert_eq!(dict.get_exact("kept").unwrap().iter().collect::<Vec<_>>(), vec![0]);
+        assert_eq!(dict.get_exact("a").unwrap().iter().collect::<Vec<_>>(), vec![2]);
+        assert_eq!(dict.count("value_1"), Some(0));
+
+        dict.keep_only(&Bitmap::of(&[0]));
+        dict.add("b", 3);
+        assert_eq!(dict.get_exact("b").unwrap().iter().collect::<Vec<_>>(), vec![3]);
+        assert!(dict.get_exact("a").unwrap().is_empty());
+    }
+
+    #[test]
+    fn merge_combines_postings() {
+        let mut a = StrDictionary::new();
+        let mut b = StrDictionary::new();
+        a.add("x", 1);
+        b.add("x", 2);
+        b.add("y", 3);
+        a.merge(&b);
+
+        assert_eq!(a.get_exact("x").unwrap().iter().collect::<Vec<_>>(), vec![1, 2]);
+        assert_eq!(a.get_exact("y").unwrap().iter().collect::<Vec<_>>(), vec![3]);
+    }
+}
@@ -2,24 +2,27 @@ use std::{collections::HashMap, hash::{BuildHasher, Hash, Hasher}, sync::{Arc, R
 
 use rustc_hash::FxBuildHasher;
 
+// `S` hashes within a shard, keys that already carry their own hash can pass it straight through.
+// Fx by default, the keys are small and never attacker chosen so SipHash buys nothing
 #[derive(Clone)]
-pub struct ShardedHashMap<K, V> {
-    shards: Arc<[RwLock<HashMap<K, V>>]>,
+pub struct ShardedHashMap<K, V, S = FxBuildHasher> {
+    shards: Arc<[RwLock<HashMap<K, V, S>>]>,
     mask: usize,
 }
 
 
-impl<K, V> ShardedHashMap<K, V>
+impl<K, V, S> ShardedHashMap<K, V, S>
 where
     K: Eq + Hash + Clone,
-    V: Clone
+    V: Clone,
+    S: BuildHasher + Default,
 {
     pub fn with_shard_count(shard_count: usize) -> Self {
         assert!(shard_count.is_power_of_two());
 
         let mut shards = Vec::with_capacity(shard_count);
         for _ in 0..shard_count {
-            let map: HashMap<K, V> = HashMap::new();
+            let map: HashMap<K, V, S> = HashMap::default();
             shards.push(RwLock::new(map));
         }
 
@@ -31,13 +34,12 @@ where
 }
 
 
-impl<K, V> ShardedHashMap<K, V>
+impl<K, V, S> ShardedHashMap<K, V, S>
 where
     K: Hash,
 {
     #[inline]
     fn shard_for(&self, key: &K) -> usize {
-        FxBuildHasher::default().build_hasher();
         let mut h = FxBuildHasher::default().build_hasher();
         key.hash(&mut h);
         (h.finish() as usize) & self.mask
@@ -45,10 +47,11 @@ where
 }
 
 
-impl<K, V> ShardedHashMap<K, V>
+impl<K, V, S> ShardedHashMap<K, V, S>
 where
     K: Eq + Hash + Clone,
     V: Clone,
+    S: BuildHasher,
 {
     pub fn insert(&self, key: K, value: V) -> Option<V> {
         let shard_idx = self.shard_for(&key);
@@ -62,13 +65,22 @@ where
         guard.get(key).cloned()
     }
 
-    pub fn get_shard(&self, key: &K) -> RwLockWriteGuard<HashMap<K, V>> {
+    pub fn with_value<F, R>(&self, key: &K, f: F) -> Option<R>
+    where
+        F: FnOnce(&V) -> R,
+    {
+        let shard_idx = self.shard_for(key);
+        let guard = self.shards[shard_idx].read().unwrap();
+        guard.get(key).map(f)
+    }
+
+    pub fn get_shard(&self, key: &K) -> RwLockWriteGuard<HashMap<K, V, S>> {
         let shard_idx = self.shard_for(key);
         let guard = self.shards[shard_idx].write().unwrap();
         guard
     }
 
-    pub fn get_mut(&self, key: &K) -> Option<RwLockWriteGuard<HashMap<K, V>>> {
+    pub fn get_mut(&self, key: &K) -> Option<RwLockWriteGuard<HashMap<K, V, S>>> {
         let shard_idx = self.shard_for(key);
         let guard = self.shards[shard_idx].write().unwrap();
 
@@ -107,12 +119,17 @@ where
         self.shards.iter().all(|shard| shard.read().unwrap().is_empty())
     }
 
+    pub fn len(&self) -> usize {
+        self.shards.iter().map(|shard| shard.read().unwrap().len()).sum()
+    }
+
 }
 
-impl<K, V> Default for ShardedHashMap<K, V>
+impl<K, V, S> Default for ShardedHashMap<K, V, S>
 where
     K: Eq + Hash + Clone,
-    V: Clone
+    V: Clone,
+    S: BuildHasher + Default,
 {
     fn default() -> Self {
         // Pick a reasonable default shard count, must be a power of two
@@ -130,7 +147,7 @@ mod tests {
 
     #[test]
     fn basic_operations() {
-        let map = ShardedHashMap::with_shard_count(4);
+        let map: ShardedHashMap<&str, i32> = ShardedHashMap::with_shard_count(4);
 
         // insert
         assert_eq!(map.insert("a", 1), None);
@@ -142,6 +159,12 @@ mod tests {
         assert_eq!(map.get(&"b"), Some(2));
         assert_eq!(map.get(&"c"), None);
 
+        // borrow in place
+        assert_eq!(map.with_value(&"a", |v| v * 2), Some(6));
+        assert_eq!(map.with_value(&"c", |v| v * 2), None);
+
+        assert_eq!(map.len(), 2);
+
         // remove
         assert_eq!(map.remove(&"a"), Some(3));
         assert_eq!(map.get(&"a"), None);
@@ -149,7 +172,7 @@ mod tests {
 
     #[test]
     fn concurrent_insert_get() {
-        let map = Arc::new(ShardedHashMap::with_shard_count(8));
+        let map: Arc<ShardedHashMap<String, usize>> = Arc::new(ShardedHashMap::with_shard_count(8));
         let threads = 4;
         let barrier = Arc::new(Barrier::new(threads));
 
@@ -10,11 +10,42 @@ use rustc_hash::FxHasher;
 use crate::index::core::structures::string_interner::InternedStr;
 use crate::index::types::StrId;
 
-type FxBuildHasher = BuildHasherDefault<FxHasher>;
+pub(crate) type PrehashedBuildHasher = BuildHasherDefault<PrehashedHasher>;
+
+// table keys already carry the Fx hash of the string bytes,
+// pass it through instead of hashing the (hash, len) tuple a second time.
+// also used for PyValue keys, which hash as their precomputed u64
+#[derive(Default)]
+pub(crate) struct PrehashedHasher(u64);
+
+impl std::hash::Hasher for PrehashedHasher {
+    #[inline(always)]
+    fn write(&mut self, bytes: &[u8]) {
+        // not hit by the (u64, u32) key, kept for completeness
+        for &b in bytes {
+            self.0 = self.0.rotate_left(8) ^ b as u64;
+        }
+    }
+
+    #[inline(always)]
+    fn write_u64(&mut self, n: u64) {
+        self.0 ^= n;
+    }
+
+    #[inline(always)]
+    fn write_u32(&mut self, n: u32) {
+        self.0 ^= n as u64;
+    }
+
+    #[inline(always)]
+    fn finish(&self) -> u64 {
+        self.0
+    }
+}
 
 pub struct ImmutableInterner {
     pub(crate) strings: Vec<InternedStr>,
-    pub(crate) table: HashMap<(u64, u32), SmallVec<[StrId; 1]>, FxBuildHasher>,
+    pub(crate) table: HashMap<(u64, u32), SmallVec<[StrId; 1]>, PrehashedBuildHasher>,
 }
 
 impl ImmutableInterner {
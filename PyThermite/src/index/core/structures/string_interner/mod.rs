@@ -8,6 +8,7 @@ pub use interner_view::StrInternerView;
 pub use interner::InternedStr;
 pub use immutable_interner::ImmutableInterner;
 pub use mutable_interner::MutableInterner;
+pub(crate) use immutable_interner::PrehashedBuildHasher;
 
 pub static INTERNER: once_cell::sync::Lazy<StrInterner> = once_cell::sync::Lazy::new(|| {
     StrInterner::with_capacity(1024)
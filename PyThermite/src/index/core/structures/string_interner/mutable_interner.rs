@@ -2,16 +2,13 @@ use std::{hash::BuildHasherDefault, ptr::NonNull, sync::Arc};
 
 use bumpalo::Bump;
 use hashbrown::HashMap;
-use rustc_hash::FxHasher;
 use smallvec::SmallVec;
-use crate::index::{core::structures::string_interner::{ImmutableInterner, InternedStr}, types::StrId};
-
-type FxBuildHasher = BuildHasherDefault<FxHasher>;
+use crate::index::{core::structures::string_interner::{ImmutableInterner, InternedStr, immutable_interner::PrehashedBuildHasher}, types::StrId};
 
 pub struct MutableInterner {
     pub(crate) arena: Bump,
     pub(crate) strings: Vec<InternedStr>,
-    pub(crate) table: HashMap<(u64, u32), SmallVec<[StrId; 1]>, FxBuildHasher>,
+    pub(crate) table: HashMap<(u64, u32), SmallVec<[StrId; 1]>, PrehashedBuildHasher>,
 }
 
 impl MutableInterner {
@@ -19,7 +16,7 @@ impl MutableInterner {
         Self {
             arena: Bump::with_capacity(cap * 16),
             strings: Vec::with_capacity(cap),
-            table: HashMap::with_capacity_and_hasher(cap, FxBuildHasher::default()),
+            table: HashMap::with_capacity_and_hasher(cap, PrehashedBuildHasher::default()),
         }
     }
 
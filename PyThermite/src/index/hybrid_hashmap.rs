@@ -123,6 +123,15 @@ where
         HybridHashmap::Small(SmallKVMap::new())
     }
 
+    pub fn with_capacity(capacity: usize) -> Self {
+        // skip the small -> map drain when the size is known up front
+        if capacity <= SMALL_SIZE {
+            HybridHashmap::Small(SmallKVMap::new())
+        } else {
+            HybridHashmap::Map(FxHashMap::with_capacity_and_hasher(capacity, Default::default()))
+        }
+    }
+
     #[inline(always)]
     pub fn insert(&mut self, key: K, value: V) {
         match self {
@@ -1,32 +1,79 @@
-use pyo3::exceptions::PyAttributeError;
+use pyo3::exceptions::{PyAttributeError, PyTypeError, PyValueError};
 use pyo3::types::PyDictMethods;
 use pyo3::types::PyStringMethods;
-use pyo3::{ffi, IntoPyObjectExt, PyErr, PyRef};
+use pyo3::types::{PyWeakrefMethods, PyWeakrefReference};
+use pyo3::{ffi, intern, IntoPyObjectExt, PyErr, PyRef};
 
+use once_cell::sync::Lazy;
+use rustc_hash::{FxHashMap, FxHasher};
 use smallvec::SmallVec;
 
+use std::cell::RefCell;
 use std::fmt;
 use std::sync::MutexGuard;
 use std::sync::{Arc, Mutex, Weak};
 use std::hash::{Hash, Hasher};
-use pyo3::{pyclass, pymethods, types::{PyAnyMethods, PyDict, PyList, PyString}, Bound, Py, PyAny, PyObject, PyResult, Python};
+use pyo3::{pyclass, pymethods, types::{PyAnyMethods, PyDict, PyList, PyString, PyType}, Bound, Py, PyAny, PyObject, PyResult, Python};
 
 use crate::index::core::id_alloc::allocate_id;
 use crate::index::core::id_alloc::free_id;
+use crate::index::core::structures::bounded_cache::BoundedCache;
 use crate::index::core::structures::string_interner::INTERNER;
 use crate::index::core::structures::string_interner::StrInternerView;
 use crate::index::types::DEFAULT_INDEX_ARC;
 use crate::index::types::StrId;
-use crate::index::value::PyValue;
+use crate::index::value::{PyValue, RustCastValue};
 use crate::index::HybridHashmap;
 use crate::index::core::index::IndexAPI;
 
 
+const ATTR_NAME_CACHE_LIMIT: usize = 4096;
+
+// registrations between full sweeps of the intern table never drop below this
+const INTERN_SWEEP_MIN: usize = 1024;
+
+// canonical instances handed out by intern(), bucketed by class and content hash
+static INTERNED: Lazy<Mutex<InternTable>> = Lazy::new(|| Mutex::new(InternTable::default()));
+
+/// Weak references only, so interning never keeps an object or its id alive. Entries
+/// whose object died or was mutated out of its bucket are dropped when their bucket is
+/// next looked up, and the whole table is swept once registrations since the last sweep
+/// outgrow what survived it.
+#[derive(Default)]
+struct InternTable {
+    buckets: FxHashMap<u64, SmallVec<[Py<PyWeakrefReference>; 1]>>,
+    registered: usize,
+    live_after_sweep: usize,
+}
+
+impl InternTable {
+    // the live canonical still filed under `key`, None once it died or changed content
+    fn upgrade<'py>(py: Python<'py>, entry: &Py<PyWeakrefReference>, key: u64) -> Option<Bound<'py, Indexable>> {
+        let candidate = entry.bind(py).upgrade_as::<Indexable>().ok().flatten()?;
+        let type_ptr = candidate.get_type().as_ptr() as usize;
+        (candidate.borrow().content_hash(type_ptr) == key).then_some(candidate)
+    }
+
+    fn sweep(&mut self, py: Python) {
+        self.buckets.retain(|key, bucket| {
+            bucket.retain(|entry| Self::upgrade(py, entry, *key).is_some());
+            !bucket.is_empty()
+        });
+        self.live_after_sweep = self.buckets.values().map(|bucket| bucket.len()).sum();
+        self.registered = 0;
+    }
+}
+
+thread_local! {
+    // holding the name object keeps its address from being reused by a different string
+    static ATTR_NAME_IDS: RefCell<BoundedCache<usize, (Py<PyAny>, StrId)>> = RefCell::new(BoundedCache::new(ATTR_NAME_CACHE_LIMIT));
+}
+
 struct IndexMeta{
     index: Weak<IndexAPI>,
 }
 
-#[pyclass(subclass, freelist = 512)]
+#[pyclass(subclass, weakref, freelist = 512)]
 pub struct Indexable{
     meta: Arc<Mutex<SmallVec<[IndexMeta; 4]>>>,
     pub py_values: Arc<Mutex<HybridHashmap<StrId, PyValue>>>,
@@ -44,19 +91,17 @@ impl Indexable{
         _args: &Bound<'_, PyAny>, kwargs: Option<&Bound<'_, PyDict>>
     ) -> Self {
 
-        let mut py_values: HybridHashmap<StrId, PyValue>;
+        let mut py_values: HybridHashmap<StrId, PyValue> = HybridHashmap::with_capacity(
+            kwargs.map_or(0, |dict| dict.len())
+        );
         let mut interner = StrInternerView::new(&INTERNER);
 
         if let Some(dict) = kwargs {
-            py_values = HybridHashmap::new();
             for (key, value) in dict.iter() {
-                if let Ok(key_str) = key.extract::<&str>() {
-                    let key_id: StrId = interner.intern(key_str);
+                if let Some(key_id) = Self::attr_name_id(&key, &mut interner) {
                     py_values.insert(key_id, PyValue::new(value));
                 }
             }
-        } else {
-            py_values = HybridHashmap::new();
         }
 
         Self {
@@ -67,39 +112,89 @@ impl Indexable{
         }
     }
 
-    fn __setattr__<'py>(&self, py: Python, name: &str, value: Bound<'py, PyAny>) -> PyResult<()> {
+    #[classmethod]
+    #[pyo3(signature = (**columns))]
+    fn from_columns<'py>(
+        cls: &Bound<'py, PyType>, columns: Option<&Bound<'py, PyDict>>
+    ) -> PyResult<Vec<Py<PyAny>>> {
 
-        let val: PyValue = PyValue::new(value);
+        let Some(columns) = columns else {
+            return Ok(vec![]);
+        };
 
+        // resolve names and pull every column into rust once, rows are then built
+        // without another python call per attribute
         let mut interner = StrInternerView::new(&INTERNER);
-        for ind in self.meta.lock().unwrap().iter() {
-            py.allow_threads(||{
-                if let Some(full_index) = ind.index.upgrade() {
-                    let name_id = interner.intern(name);
-                    if let Some(old_val) = self.get_py_values().get(&name_id){
-                        full_index.update_index(ind.index.clone(), name_id, Some(old_val), &val, self.id);
-                    } else {
-                        full_index.update_index(ind.index.clone(), name_id, None, &val, self.id);
-                    }
+        let mut key_ids: Vec<StrId> = Vec::with_capacity(columns.len());
+        let mut values: Vec<Vec<Bound<'py, PyAny>>> = Vec::with_capacity(columns.len());
+
+        for (key, column) in columns.iter() {
+            let key_id = Self::attr_name_id(&key, &mut interner)
+                .ok_or_else(|| PyTypeError::new_err("column names must be strings"))?;
+            key_ids.push(key_id);
+            // numpy arrays hand back native scalars in one call rather than boxing each item
+            let column = if column.hasattr("tolist")? {
+                column.call_method0("tolist")?
+            } else {
+                column
+            };
+            values.push(column.try_iter()?.collect::<PyResult<_>>()?);
+        }
+
+        let rows = values.first().map_or(0, |column| column.len());
+        if values.iter().any(|column| column.len() != rows) {
+            return Err(PyValueError::new_err("all columns must have the same length"));
+        }
+
+        let mut out = Vec::with_capacity(rows);
+        for row in 0..rows {
+            // __new__ only, rows are filled from the columns rather than __init__ arguments
+            let obj = cls.call_method1(intern!(cls.py(), "__new__"), (cls,))?;
+            {
+                // added next to anything __new__ set, set_attr_id keeps any index it joined current
+                let indexable = obj.downcast::<Indexable>()?.borrow();
+                for (key_id, column) in key_ids.iter().zip(values.iter()) {
+                    indexable.set_attr_id(*key_id, PyValue::new(column[row].clone()));
                 }
-            });
+            }
+            out.push(obj.unbind());
         }
+        Ok(out)
+    }
 
-        // update value
-        let str_id: StrId = interner.intern(name);
-        self.py_values.lock().unwrap().insert(str_id, val);
+    fn __setattr__<'py>(&self, py: Python, name: &str, value: Bound<'py, PyAny>) -> PyResult<()> {
+
+        let val: PyValue = PyValue::new(value);
+        let str_id: StrId = INTERNER.intern(name);
+
+        if self.meta.lock().unwrap().is_empty() {
+            self.py_values.lock().unwrap().insert(str_id, val);
+        } else {
+            // release the GIL once for all attached indexes
+            py.allow_threads(|| self.set_attr_id(str_id, val));
+        }
         Ok(())
     }
 
     fn __getattribute__(self_: PyRef<'_, Self>, py: Python, name: Bound<'_, PyString>) -> PyResult<PyObject> {
 
-        let name_str = match name.to_str() {
-            Ok(s) => s,
-            Err(_) => return Err(PyAttributeError::new_err("Invalid attribute name")),
+        // every hop of a.b.c comes through here with the interned name object the
+        // bytecode holds, so after the first access the id is one pointer lookup
+        let name_id = match Self::cached_name_id(name.as_any()) {
+            Some(id) => id,
+            None => {
+                let name_str = match name.to_str() {
+                    Ok(s) => s,
+                    Err(_) => return Err(PyAttributeError::new_err("Invalid attribute name")),
+                };
+                let id = INTERNER.intern(name_str);
+                Self::cache_name_id(name.as_any(), id);
+                id
+            }
         };
         let py_values = self_.get_py_values();
 
-        if let Some(value) = py_values.get(&INTERNER.intern(name_str)) {
+        if let Some(value) = py_values.get(&name_id) {
             Ok(value.get_obj(py))
         } else {
             drop(py_values);
@@ -135,6 +230,43 @@ impl Indexable{
         Ok(PyList::new(py, names)?.into())
     }
 
+    fn intern(slf: Bound<'_, Self>) -> PyResult<Py<Indexable>> {
+        let py = slf.py();
+        // list, dict, tuple and set values hash and compare by identity rather than content,
+        // such an object could never match another one, so it is handed back unregistered
+        if slf.borrow().holds_iterable() {
+            return Ok(slf.unbind());
+        }
+        let type_ptr = slf.get_type().as_ptr() as usize;
+        let key = slf.borrow().content_hash(type_ptr);
+
+        let mut table = INTERNED.lock().unwrap();
+        if table.registered >= table.live_after_sweep.max(INTERN_SWEEP_MIN) {
+            table.sweep(py);
+        }
+        let bucket = table.buckets.entry(key).or_default();
+        let mut canonical = None;
+        bucket.retain(|entry| match InternTable::upgrade(py, entry, key) {
+            Some(candidate) => {
+                if canonical.is_none()
+                    && (candidate.is(&slf)
+                        || (candidate.get_type().as_ptr() as usize == type_ptr
+                            && candidate.borrow().same_values(&slf.borrow())))
+                {
+                    canonical = Some(candidate);
+                }
+                true
+            }
+            None => false,
+        });
+        if let Some(candidate) = canonical {
+            return Ok(candidate.unbind());
+        }
+        bucket.push(PyWeakrefReference::new(slf.as_any())?.unbind());
+        table.registered += 1;
+        Ok(slf.unbind())
+    }
+
     fn __repr__(&self) -> PyResult<String> {
         Ok(format!("<Indexable with {} attributes>", self.get_py_values().len()))
     }
@@ -142,6 +274,29 @@ impl Indexable{
 
 impl Indexable {
 
+    fn attr_name_id(key: &Bound<'_, PyAny>, interner: &mut StrInternerView) -> Option<StrId> {
+        // kwarg names are usually the same str objects on every call, resolve by identity first
+        if let Some(key_id) = Self::cached_name_id(key) {
+            return Some(key_id);
+        }
+
+        let key_id: StrId = interner.intern(key.extract::<&str>().ok()?);
+        Self::cache_name_id(key, key_id);
+        Some(key_id)
+    }
+
+    #[inline(always)]
+    fn cached_name_id(key: &Bound<'_, PyAny>) -> Option<StrId> {
+        let ptr = key.as_ptr() as usize;
+        ATTR_NAME_IDS.with(|cache| cache.borrow_mut().get(&ptr).map(|(_, id)| *id))
+    }
+
+    fn cache_name_id(key: &Bound<'_, PyAny>, key_id: StrId) {
+        ATTR_NAME_IDS.with(|cache| {
+            cache.borrow_mut().insert(key.as_ptr() as usize, (key.clone().unbind(), key_id));
+        });
+    }
+
     pub fn from_py_ref(reference: &PyRef<Indexable>, _py: Python) -> Self {
         // `reference` is a GIL-bound borrow; we clone the Arc pointers for Rust ownership
         Self {
@@ -152,11 +307,11 @@ impl Indexable {
         }
     }
 
-    fn trim_indexes(meta_lock: &mut MutexGuard<'_, SmallVec<[IndexMeta; 4]>>, remove: Arc<IndexAPI>){
+    fn trim_indexes(meta_lock: &mut MutexGuard<'_, SmallVec<[IndexMeta; 4]>>, remove: &Arc<IndexAPI>){
         meta_lock.retain(|m| {
             // Try to upgrade the Weak
             if let Some(arc) = m.index.upgrade() {
-                if Arc::ptr_eq(&arc, &remove) {
+                if Arc::ptr_eq(&arc, remove) {
                     return false
                 } else {
                     !Arc::ptr_eq(&arc, &DEFAULT_INDEX_ARC)
@@ -170,17 +325,45 @@ impl Indexable {
     #[inline(always)]
     pub fn add_index(&self, index: Weak<IndexAPI>) {
         let mut meta_lock: MutexGuard<'_, SmallVec<[IndexMeta; 4]>> = self.meta.lock().unwrap();
-        meta_lock.push(IndexMeta {
+        if !meta_lock.is_empty() {
+            Self::trim_indexes(&mut meta_lock, &DEFAULT_INDEX_ARC);
+        }
+
+        // same entries the trim would drop
+        let ptr = Weak::as_ptr(&index);
+        if index.strong_count() == 0 || std::ptr::eq(ptr, Arc::as_ptr(&*DEFAULT_INDEX_ARC)) {
+            return;
+        }
+
+        // the rest are live, so order by the weak pointer in place instead of upgrading
+        // every entry to re-sort the whole list
+        let pos = meta_lock.partition_point(|m| Weak::as_ptr(&m.index) as usize <= ptr as usize);
+        meta_lock.insert(pos, IndexMeta {
             index: index,
         });
-
-        Self::trim_indexes(&mut meta_lock, DEFAULT_INDEX_ARC.clone());
-        meta_lock.sort_by_key(|ind| Arc::as_ptr(&ind.index.upgrade().unwrap_or_else( || DEFAULT_INDEX_ARC.clone())) as usize);
     }
 
     pub fn remove_index(&self, index: Arc<IndexAPI>) {
         let mut meta_lock: MutexGuard<'_, SmallVec<[IndexMeta; 4]>> = self.meta.lock().unwrap();
-        Self::trim_indexes(&mut meta_lock, index);
+        Self::trim_indexes(&mut meta_lock, &index);
+    }
+
+    /// Sets an attribute by interned id and moves the object within every index it is
+    /// attached to. Does not need the GIL.
+    pub fn set_attr_id(&self, str_id: StrId, val: PyValue) {
+        let meta = self.meta.lock().unwrap();
+        if !meta.is_empty() {
+            let old_val = self.get_py_values().get(&str_id).cloned();
+            for ind in meta.iter() {
+                if let Some(full_index) = ind.index.upgrade() {
+                    full_index.update_index(ind.index.clone(), str_id, old_val.as_ref(), &val, self.id);
+                }
+            }
+        }
+        drop(meta);
+
+        // update value
+        self.py_values.lock().unwrap().insert(str_id, val);
     }
 
     pub fn get_py_values(&self) -> MutexGuard<'_, HybridHashmap<StrId, PyValue>>{
@@ -195,6 +378,53 @@ impl Indexable {
         let guard = self.get_py_values();
         guard.get(&str_id).map(f)
     }
+
+    // order independent over attributes, nested Indexables hash by identity so
+    // children are interned first for whole subtrees to collapse
+    fn content_hash(&self, type_ptr: usize) -> u64 {
+        let values = self.get_py_values();
+        let mut pairs: SmallVec<[(StrId, u64); 8]> = values.iter()
+            .map(|(k, v)| (*k, v.get_hash()))
+            .collect();
+        drop(values);
+        pairs.sort_unstable();
+
+        let mut hasher = FxHasher::default();
+        hasher.write_usize(type_ptr);
+        for (k, h) in pairs {
+            hasher.write_u32(k);
+            hasher.write_u64(h);
+        }
+        hasher.finish()
+    }
+
+    fn holds_iterable(&self) -> bool {
+        self.get_py_values().iter().any(|(_, v)| matches!(v.get_primitive(), RustCastValue::Iterable(_)))
+    }
+
+    fn same_values(&self, other: &Indexable) -> bool {
+        let values = self.get_py_values();
+        let other_values = other.get_py_values();
+        values.len() == other_values.len()
+            && values.iter().all(|(k, v)| other_values.get(k).map_or(false, |ov| ov == v))
+    }
+
+    /// Value at the end of a path of interned attribute ids, `None` if any hop is missing
+    /// or is not an Indexable.
+    pub fn get_path_value(&self, ids: &[StrId]) -> Option<PyValue> {
+        let (last, hops) = ids.split_last()?;
+        let mut current: Option<Arc<Indexable>> = None;
+        for hop in hops {
+            let owner: &Indexable = current.as_deref().unwrap_or(self);
+            // only the child handle leaves the lock, the next hop locks the child alone
+            let next = owner.with_attr_id(*hop, |val| match val.get_primitive() {
+                RustCastValue::Ind(ind) => Some(ind.owned_handle.clone()),
+                _ => None,
+            })??;
+            current = Some(next);
+        }
+        current.as_deref().unwrap_or(self).with_attr_id(*last, |val| val.clone())
+    }
 }
 
 impl Drop for Indexable {
@@ -1,21 +1,27 @@
-use std::{sync::{Arc, RwLock}};
+use std::{sync::{Arc, Mutex, RwLock, atomic::AtomicU64}};
 
 use croaring::Bitmap;
-use pyo3::{pyclass, pymethods, Py, PyAny, PyResult, Python};
+use pyo3::{exceptions::PyIndexError, pyclass, pymethods, types::{PyAnyMethods, PyIterator, PyList, PyListMethods}, Bound, Py, PyAny, PyRef, PyResult, Python};
 use rustc_hash::FxHashMap;
 use smol_str::SmolStr;
 
-use crate::index::{Index, Indexable, PyQueryExpr, core::{query::query_ops::{QueryExpr, evaluate_and_queries_vec}, structures::m2m::M2MU32}, types::IndexTree, value::PyValue};
+use crate::index::{Index, Indexable, PyQueryExpr, core::{query::query_ops::{QueryExpr, evaluate_and_queries_vec}, structures::{m2m::M2MU32, string_interner::INTERNER}}, types::IndexTree, value::PyValue};
 use crate::index::core::stored_item::StoredItem;
 use crate::index::core::index::IndexAPI;
-use crate::index::core::query::{evaluate_query, QueryMap};
+use crate::index::core::query::{AttrPath, evaluate_query, QueryMap};
 
 #[pyclass]
 #[derive(Clone)]
 pub struct FilteredIndex {
     pub index: IndexTree,
     pub items: Arc<RwLock<Vec<StoredItem>>>,
+    // the owning index's allow list, every id that still holds an object
+    pub(crate) live_items: Arc<RwLock<Bitmap>>,
+    pub(crate) live_generation: Arc<AtomicU64>,
     pub allowed_items: Bitmap,
+    // the collected objects with the live_generation they were built at, rebuilt once the
+    // owning index has added or dropped objects since
+    pub(crate) collected: Arc<Mutex<Option<(u64, Py<PyList>)>>>,
 }
 
 
@@ -43,39 +49,148 @@ impl FilteredIndex{
         py.allow_threads(move || {
             let index = self.index.read().unwrap();
             let exprs: Vec<QueryExpr> = query.into_iter().map(|(k, v)| {
-                QueryExpr::Eq(k, v)
+                QueryExpr::Eq(AttrPath::new(&k), v)
             }).collect();
 
-            Ok(FilteredIndex {
-                index: self.index.clone(),
-                items: self.items.clone(),
-                allowed_items: evaluate_and_queries_vec(&index, &self.allowed_items, &exprs)
-            })
+            Ok(self.with_bitmap(
+                evaluate_and_queries_vec(&index, &self.allowed_items, &exprs)
+            ))
         })
     }
 
     pub fn reduced_query(
         &self,
+        py: Python,
         query: PyQueryExpr,
-    ) -> FilteredIndex {
-        let index = self.index.read().unwrap();
-        let allowed = &self.allowed_items;
-        self.filter_from_bitmap(
-            evaluate_query(&index, &allowed, &query.inner)
-        )
+    ) -> PyResult<FilteredIndex> {
+        // evaluation may fan out to rayon workers, none of them can wait on a held GIL
+        py.allow_threads(move || {
+            let index = self.index.read().unwrap();
+            let allowed = &self.allowed_items;
+            Ok(self.filter_from_bitmap(
+                evaluate_query(&index, &allowed, &query.inner)
+            ))
+        })
+    }
+
+    pub fn collect(&self, py:Python) -> PyResult<Py<PyList>> {
+        let collected = self.get_collected(py)?;
+        // shallow copy, callers may mutate what they get back
+        let collected = collected.bind(py);
+        Ok(collected.get_slice(0, collected.len()).unbind())
+    }
+
+    pub fn values(&self, py: Python, path: &str) -> PyResult<Py<PyList>> {
+        // one pass over the live allow list in id order, the path is resolved once and each
+        // hop is an id lookup rather than a python attribute access. the ids are the ones
+        // len(), indexing and collect() see, so positions line up with them
+        let path = AttrPath::new(path);
+        let (ids, _) = self.current_ids();
+        let items = self.items.read().unwrap();
+        let values: Vec<Py<PyAny>> = ids.iter()
+            .map(|idx| &items[idx as usize])
+            .filter(|item| !item.is_vacant())
+            .map(|item| item.get_owned_handle().get_path_value(path.ids())
+                .map_or_else(|| py.None(), |val| val.get_obj(py)))
+            .collect();
+        Ok(PyList::new(py, values)?.unbind())
+    }
+
+    pub fn __len__(&self) -> usize {
+        // counted against the owning index's live ids, nothing is materialized
+        self.current_len() as usize
+    }
+
+    pub fn count(&self) -> usize {
+        self.__len__()
+    }
+
+    pub fn __getitem__(&self, py: Python, idx: isize) -> PyResult<Py<Indexable>> {
+        let (ids, _) = self.current_ids();
+        let len = ids.cardinality() as isize;
+        let pos = if idx < 0 { idx + len } else { idx };
+        if pos < 0 || pos >= len {
+            return Err(PyIndexError::new_err("FilteredIndex index out of range"));
+        }
+        // rank select on the live allow list, only the requested object is looked up
+        let id = ids.select(pos as u32)
+            .ok_or_else(|| PyIndexError::new_err("FilteredIndex index out of range"))?;
+        let items = self.items.read().unwrap();
+        let item = &items[id as usize];
+        // a slot emptied by a removal still in flight, never hand out the shared placeholder
+        if item.is_vacant() {
+            return Err(PyIndexError::new_err("FilteredIndex index out of range"));
+        }
+        Ok(item.get_py_ref(py))
     }
 
-    pub fn collect(&self, py:Python) -> PyResult<Vec<Py<Indexable>>> {
-        self.get_from_indexes(py, &self.allowed_items)
+    pub fn __and__(&self, other: PyRef<'_, FilteredIndex>) -> PyResult<FilteredIndex> {
+        self.same_source(&other)?;
+        // combined on the allow lists, neither side is collected
+        Ok(self.with_bitmap(self.allowed_items.and(&other.allowed_items)))
+    }
+
+    pub fn __or__(&self, other: PyRef<'_, FilteredIndex>) -> PyResult<FilteredIndex> {
+        self.same_source(&other)?;
+        Ok(self.with_bitmap(self.allowed_items.or(&other.allowed_items)))
+    }
+
+    pub fn __sub__(&self, other: PyRef<'_, FilteredIndex>) -> PyResult<FilteredIndex> {
+        self.same_source(&other)?;
+        Ok(self.with_bitmap(self.allowed_items.andnot(&other.allowed_items)))
+    }
+
+    pub fn __invert__(&self) -> FilteredIndex {
+        // complemented against the owning index's live ids, the item slab is not walked
+        let bm = self.live_items.read().unwrap().andnot(&self.allowed_items);
+        self.with_bitmap(bm)
+    }
+
+    pub fn __iter__<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyIterator>> {
+        // iterates the shared collect() result, a second pass does not rebuild it
+        let collected = self.get_collected(py)?;
+        collected.bind(py).try_iter()
+    }
+
+    pub fn set_attr_many<'py>(&self, py: Python<'py>, name: &str, factory: Bound<'py, PyAny>) -> PyResult<()> {
+        let str_id = INTERNER.intern(name);
+
+        // build every value first so the index updates below run in one GIL release.
+        // each object is still moved within its indexes one at a time, not in one batch
+        let (ids, _) = self.current_ids();
+        let handles: Vec<Arc<Indexable>> = {
+            let items = self.items.read().unwrap();
+            // vacant slots share one placeholder object, writing to it would leak the
+            // value into every empty slot
+            ids.iter()
+                .map(|idx| &items[idx as usize])
+                .filter(|item| !item.is_vacant())
+                .map(|item| item.get_owned_handle().clone())
+                .collect()
+        };
+        let mut updates: Vec<(Arc<Indexable>, PyValue)> = Vec::with_capacity(handles.len());
+        for handle in handles {
+            updates.push((handle, PyValue::new(factory.call0()?)));
+        }
+
+        py.allow_threads(move || {
+            for (handle, val) in updates {
+                handle.set_attr_id(str_id, val);
+            }
+        });
+        Ok(())
     }
 
     pub fn rebase(&self) -> PyResult<Index> {
 
-        let max_size = self.allowed_items.maximum().unwrap_or(0);
+        // objects that left the owning index would otherwise bring its placeholder along
+        let (ids, _) = self.current_ids();
+        let max_size = ids.maximum().unwrap_or(0);
         let index_api = IndexAPI {
             index: Arc::new(RwLock::new(vec![])),
             items: Arc::new(RwLock::new(Vec::with_capacity(max_size as usize))),
-            allowed_items: Arc::new(RwLock::new(self.allowed_items.clone())),
+            allowed_items: Arc::new(RwLock::new(ids.clone())),
+            allowed_generation: Arc::new(AtomicU64::new(0)),
             parent_child_map: Arc::new(RwLock::new(M2MU32::new())),
             parent_index: None,
         };
@@ -88,7 +203,7 @@ impl FilteredIndex{
         new_items.resize(max_size as usize + 1, StoredItem::default());
         
         let items = self.items.read().unwrap();
-        for idx in self.allowed_items.iter() {
+        for idx in ids.iter() {
             let item = &items[idx as usize];
 
             let owned_ref = item.get_owned_handle();
@@ -29,6 +29,10 @@ impl Index {
         self.inner.collect(py)
     }
 
+    pub fn __len__(&self) -> usize {
+        self.inner.len()
+    }
+
     #[pyo3(signature = (**kwargs))]
     pub fn reduced<'py>(
         &self,
@@ -61,23 +65,25 @@ impl Index {
         kwargs: Option<FxHashMap<String, pyo3::Bound<'py, PyAny>>>,
     ) -> PyResult<Vec<Py<Indexable>>> {
         let eq_query = kwargs_to_query(kwargs);
-        py.allow_threads(move || {
-            self.inner.reduced(eq_query)
-        }).collect(py)
+        let matched = py.allow_threads(move || {
+            self.inner.evaluate_eq_query(eq_query)
+        });
+        self.inner.get_from_indexes(py, matched)
     }
 
     pub fn add_object_many(&self, py: Python, objs: Vec<PyRef<Indexable>>) -> PyResult<()> {
         
-        let raw_objs: Vec<(Indexable, Py<Indexable>)> = objs.into_iter().map(|obj| {
+        // wrap straight into the shared handles, no intermediate owned vec
+        let arc_objs: Vec<(Arc<Indexable>, Arc<Py<Indexable>>)> = objs.into_iter().map(|obj| {
             (
-                Indexable::from_py_ref(&obj, py),
-                obj.into_pyobject(py).unwrap().unbind()
+                Arc::new(Indexable::from_py_ref(&obj, py)),
+                Arc::new(obj.into_pyobject(py).unwrap().unbind())
             )
         }).collect();
 
         py.allow_threads(|| {
             let weak_index = Arc::downgrade(&self.inner);
-            self.inner.add_object_many(weak_index, raw_objs);
+            self.inner.add_object_many(weak_index, arc_objs);
         });
 
         Ok(())
@@ -1,7 +1,6 @@
 use pyo3::{PyAny, pyclass, pymethods};
-use smol_str::SmolStr;
 
-use crate::index::{core::query::query_ops::QueryExpr, value::PyValue};
+use crate::index::{core::query::{AttrPath, query_ops::QueryExpr}, value::PyValue};
 
 
 #[pyclass]
@@ -15,49 +14,49 @@ impl PyQueryExpr {
     #[staticmethod]
     pub fn eq<'py>(attr: String, value: pyo3::Bound<'py, PyAny>) -> Self {
         Self {
-            inner: QueryExpr::Eq(SmolStr::new(attr), PyValue::new(value)),
+            inner: QueryExpr::Eq(AttrPath::new(&attr), PyValue::new(value)),
         }
     }
 
     #[staticmethod]
     pub fn ne<'py>(attr: String, value: pyo3::Bound<'py, PyAny>) -> Self {
         Self {
-            inner: QueryExpr::Ne(SmolStr::new(attr), PyValue::new(value)),
+            inner: QueryExpr::Ne(AttrPath::new(&attr), PyValue::new(value)),
         }
     }
 
     #[staticmethod]
     pub fn gt<'py>(attr: String, value: pyo3::Bound<'py, PyAny>) -> Self {
         Self {
-            inner: QueryExpr::Gt(SmolStr::new(attr), PyValue::new(value)),
+            inner: QueryExpr::Gt(AttrPath::new(&attr), PyValue::new(value)),
         }
     }
 
     #[staticmethod]
     pub fn ge<'py>(attr: String, value: pyo3::Bound<'py, PyAny>) -> Self {
         Self {
-            inner: QueryExpr::Ge(SmolStr::new(attr), PyValue::new(value)),
+            inner: QueryExpr::Ge(AttrPath::new(&attr), PyValue::new(value)),
         }
     }
 
     #[staticmethod]
     pub fn le<'py>(attr: String, value: pyo3::Bound<'py, PyAny>) -> Self {
         Self {
-            inner: QueryExpr::Le(SmolStr::new(attr), PyValue::new(value)),
+            inner: QueryExpr::Le(AttrPath::new(&attr), PyValue::new(value)),
         }
     }
 
     #[staticmethod]
     pub fn bt<'py>(attr: String, lower: pyo3::Bound<'py, PyAny>, upper: pyo3::Bound<'py, PyAny>) -> Self {
         Self {
-            inner: QueryExpr::Bt(SmolStr::new(attr), PyValue::new(lower), PyValue::new(upper)),
+            inner: QueryExpr::Bt(AttrPath::new(&attr), PyValue::new(lower), PyValue::new(upper)),
         }
     }
 
     #[staticmethod]
     pub fn lt<'py>(attr: String, value: pyo3::Bound<'py, PyAny>) -> Self {
         Self {
-            inner: QueryExpr::Lt(SmolStr::new(attr), PyValue::new(value)),
+            inner: QueryExpr::Lt(AttrPath::new(&attr), PyValue::new(value)),
         }
     }
 
@@ -65,7 +64,7 @@ impl PyQueryExpr {
     pub fn in_<'py>(attr: String, values: Vec<pyo3::Bound<'py, PyAny>>) -> Self {
         let values = values.into_iter().map(|obj| PyValue::new(obj)).collect();
         Self {
-            inner: QueryExpr::In(SmolStr::new(attr), values),
+            inner: QueryExpr::In(AttrPath::new(&attr), values),
         }
     }
 
@@ -73,7 +72,7 @@ impl PyQueryExpr {
     #[pyo3(signature = (*exprs))]
     fn and_(exprs: Vec<Self>) -> Self {
         Self {
-            inner: QueryExpr::And(exprs.iter().map( | i | i.inner.clone()).collect()),
+            inner: QueryExpr::and_of(exprs.into_iter().map(|i| i.inner).collect()),
         }
     }
 
@@ -81,35 +80,35 @@ impl PyQueryExpr {
     #[pyo3(signature = (*exprs))]
     fn or_(exprs: Vec<Self>) -> Self {
         Self {
-            inner: QueryExpr::Or(exprs.iter().map( | i | i.inner.clone()).collect()),
+            inner: QueryExpr::or_of(exprs.into_iter().map(|i| i.inner).collect()),
         }
     }
 
     #[staticmethod]
     fn not_(exprs: Self) -> Self {
         Self {
-            inner: QueryExpr::Not(Box::new(exprs.inner)),
+            inner: QueryExpr::not_of(exprs.inner),
         }
     }
 
     #[staticmethod]
     fn starts_with<'py>(attr: String, value: pyo3::Bound<'py, PyAny>) -> Self {
         Self {
-            inner: QueryExpr::StartsWi(SmolStr::new(attr), PyValue::new(value)),
+            inner: QueryExpr::StartsWi(AttrPath::new(&attr), PyValue::new(value)),
         }
     }
 
     #[staticmethod]
     fn ends_with<'py>(attr: String, value: pyo3::Bound<'py, PyAny>) -> Self {
         Self {
-            inner: QueryExpr::EndsWi(SmolStr::new(attr), PyValue::new(value)),
+            inner: QueryExpr::EndsWi(AttrPath::new(&attr), PyValue::new(value)),
         }
     }
 
     #[staticmethod]
     fn contains<'py>(attr: String, value: pyo3::Bound<'py, PyAny>) -> Self {
         Self {
-            inner: QueryExpr::Contains(SmolStr::new(attr), PyValue::new(value)),
+            inner: QueryExpr::Contains(AttrPath::new(&attr), PyValue::new(value)),
         }
     }
 
@@ -68,9 +68,14 @@ macro_rules! cached_py_type {
 }
 
 macro_rules! cached_type_ptrs {
-    ($fn_name:ident, $type_fn:ident, $len:expr) => {
-        pub fn $fn_name(py: Python<'_>) -> SmallVec<[*mut pyo3::ffi::PyObject; $len]> {
-            $type_fn(py).iter().map(|t| t.as_ptr()).collect()
+    ($fn_name:ident, $static_name:ident, $type_fn:ident, $len:expr) => {
+        // type objects are immortal for the module lifetime, so the raw addresses are kept as usize
+        static $static_name: OnceCell<SmallVec<[usize; $len]>> = OnceCell::new();
+
+        pub fn $fn_name(py: Python<'_>) -> &'static [usize] {
+            $static_name.get_or_init(|| {
+                $type_fn(py).iter().map(|t| t.as_ptr() as usize).collect()
+            })
         }
     };
 }
@@ -94,7 +99,7 @@ pub fn int_types(py: Python<'_>) -> &'_ [Py<PyType>] {
     })
 }
 
-cached_type_ptrs!(int_type_ptrs, int_types, 2);
+cached_type_ptrs!(int_type_ptrs, INT_TYPE_PTRS, int_types, 2);
 
 // Float types
 
@@ -115,7 +120,7 @@ pub fn float_types(py: Python<'_>) -> &'_ [Py<PyType>] {
     })
 }
 
-cached_type_ptrs!(float_type_ptrs, float_types, 2);
+cached_type_ptrs!(float_type_ptrs, FLOAT_TYPE_PTRS, float_types, 2);
 
 // Bool types
 
@@ -136,7 +141,7 @@ pub fn bool_types(py: Python<'_>) -> &'_ [Py<PyType>] {
     })
 }
 
-cached_type_ptrs!(bool_type_ptrs, bool_types, 2);
+cached_type_ptrs!(bool_type_ptrs, BOOL_TYPE_PTRS, bool_types, 2);
 
 
 // str types
@@ -158,4 +163,4 @@ pub fn str_types(py: Python<'_>) -> &'_ [Py<PyType>] {
     })
 }
 
-cached_type_ptrs!(str_type_ptrs, str_types, 2);
\ No newline at end of file
+cached_type_ptrs!(str_type_ptrs, STR_TYPE_PTRS, str_types, 2);
\ No newline at end of file
@@ -9,25 +9,14 @@ use pyo3::conversion::IntoPyObject;
 use crate::index::types::{bool_type_ptrs, float_type_ptrs, int_type_ptrs, str_type_ptrs};
 use crate::index::{types, Indexable};
 
-#[derive(Debug)]
+// shared handles, so a clone is a refcount bump and never needs the GIL. queries clone
+// their values while they run, including on rayon workers
+#[derive(Clone, Debug)]
 pub enum PyIterable {
-    List(Py<PyList>),
-    Dict(Py<PyDict>),
-    Tuple(Py<PyTuple>),
-    Set(Py<PySet>)
-}
-
-impl Clone for PyIterable {
-    fn clone(&self) -> Self {
-        Python::with_gil(|py| {
-            match self {
-                Self::List(arg0) => Self::List(arg0.clone_ref(py)),
-                Self::Dict(arg0) => Self::Dict(arg0.clone_ref(py)),
-                Self::Tuple(arg0) => Self::Tuple(arg0.clone_ref(py)),
-                Self::Set(arg0) => Self::Set(arg0.clone_ref(py)),
-            }
-        })
-    }
+    List(Arc<Py<PyList>>),
+    Dict(Arc<Py<PyDict>>),
+    Tuple(Arc<Py<PyTuple>>),
+    Set(Arc<Py<PySet>>)
 }
 
 #[derive(Clone, Debug)]
@@ -69,16 +58,17 @@ impl PyValue {
 
         let py_type = obj.get_type();
         let py = obj.py();
+        let type_ptr = py_type.as_ptr() as usize;
 
         // primitave types - check first
         let primitave = 
-        if int_type_ptrs(py).contains(&py_type.as_ptr()) {
+        if int_type_ptrs(py).contains(&type_ptr) {
             RustCastValue::Int(obj.extract::<i64>().expect("type checked"))
-        } else if float_type_ptrs(py).contains(&py_type.as_ptr()) {
+        } else if float_type_ptrs(py).contains(&type_ptr) {
             RustCastValue::Float(obj.extract::<f64>().expect("type checked"))
-        } else if str_type_ptrs(py).contains(&py_type.as_ptr()) {
+        } else if str_type_ptrs(py).contains(&type_ptr) {
             RustCastValue::Str(SmolStr::new(obj.extract::<&str>().expect("type checked")))
-        } else if bool_type_ptrs(py).contains(&py_type.as_ptr()) {
+        } else if bool_type_ptrs(py).contains(&type_ptr) {
             RustCastValue::Bool(obj.extract::<bool>().expect("type checked"))
 
         // complex types - pointer based equality
@@ -86,24 +76,41 @@ impl PyValue {
             let py_ref = obj.extract::<PyRef<Indexable>>().expect("type checked");
             RustCastValue::Ind(StoredIndexable::from_py_ref(py_ref, py))
         } else if py_type.is(pyo3::types::PyList::type_object(py)) {
-            RustCastValue::Iterable(PyIterable::List(obj.extract::<Py<PyList>>().expect("type checked")))
+            RustCastValue::Iterable(PyIterable::List(Arc::new(obj.extract::<Py<PyList>>().expect("type checked"))))
         } else if py_type.is(pyo3::types::PyTuple::type_object(py)) {
-            RustCastValue::Iterable(PyIterable::Tuple(obj.extract::<Py<PyTuple>>().expect("type checked")))
+            RustCastValue::Iterable(PyIterable::Tuple(Arc::new(obj.extract::<Py<PyTuple>>().expect("type checked"))))
         } else if py_type.is(pyo3::types::PyDict::type_object(py)) {
-            RustCastValue::Iterable(PyIterable::Dict(obj.extract::<Py<PyDict>>().expect("type checked")))
+            RustCastValue::Iterable(PyIterable::Dict(Arc::new(obj.extract::<Py<PyDict>>().expect("type checked"))))
         } else if py_type.is(pyo3::types::PySet::type_object(py)) {
-            RustCastValue::Iterable(PyIterable::Set(obj.extract::<Py<PySet>>().expect("type checked")))
+            RustCastValue::Iterable(PyIterable::Set(Arc::new(obj.extract::<Py<PySet>>().expect("type checked"))))
         } else {
             RustCastValue::Unknown
         };
 
         let hash = match &primitave {
-            RustCastValue::Unknown => obj.hash().unwrap() as u64,
+            // unknown values compare by identity, so hash the pointer rather than calling
+            // back into python, which also keeps unhashable objects indexable
+            RustCastValue::Unknown => {
+                let mut hasher = FxHasher::default();
+                hasher.write_usize(obj.as_ptr() as usize);
+                hasher.write_u8(7);
+                hasher.finish()
+            },
             _ => Self::hash_primitave(&primitave)
         };
 
+        // primitives are rebuilt from their rust copy on access, so only keep the python
+        // handle for values that need the original object. drops a duplicate str per value
+        let obj = match &primitave {
+            RustCastValue::Int(_)
+            | RustCastValue::Float(_)
+            | RustCastValue::Str(_)
+            | RustCastValue::Bool(_) => None,
+            _ => Some(Arc::new(obj.into())),
+        };
+
         Self {
-            obj: Some(Arc::new(obj.into())),
+            obj,
             primitave,
             hash,
         }
@@ -27,6 +27,12 @@ class Record(Indexable):
             "tags": self.tags,
         }
     
+STR_POOL_SIZE = 1024
+COUNTRIES = np.array(["US", "CA", "MX", "FR", "DE"])
+TAGS = np.array(["a", "b", "c", "d"])
+# each record carries the same seven fields five times over
+PREFIXES = ["", "_4_", "_3_", "_2_", "_1_"]
+
 def random_str(length=6):
     return ''.join(random.choices(string.ascii_lowercase, k=length))
 
@@ -34,51 +40,23 @@ def prep_data(size):
     random.seed(42)
     np.random.seed(42)
 
-    print("making build")
-    make_data = [
-        Record(
-            **{
-                "id": i,
-                "age": np.random.randint(18, 80),
-                "score": np.random.rand() * 100,
-                "active": np.random.choice([True, False]),
-                "country": np.random.choice(["US", "CA", "MX", "FR", "DE"]),
-                "group": random_str(),
-                "tags": np.random.choice(["a", "b", "c", "d"]),
-                "_4_id": i,
-                "_4_age": np.random.randint(18, 80),
-                "_4_score": np.random.rand() * 100,
-                "_4_active": np.random.choice([True, False]),
-                "_4_country": np.random.choice(["US", "CA", "MX", "FR", "DE"]),
-                "_4_group": random_str(),
-                "_4_tags": np.random.choice(["a", "b", "c", "d"]),
-                "_3_id": i,
-                "_3_age": np.random.randint(18, 80),
-                "_3_score": np.random.rand() * 100,
-                "_3_active": np.random.choice([True, False]),
-                "_3_country": np.random.choice(["US", "CA", "MX", "FR", "DE"]),
-                "_3_group": random_str(),
-                "_3_tags": np.random.choice(["a", "b", "c", "d"]),
-                "_2_id": i,
-                "_2_age": np.random.randint(18, 80),
-                "_2_score": np.random.rand() * 100,
-                "_2_active": np.random.choice([True, False]),
-                "_2_country": np.random.choice(["US", "CA", "MX", "FR", "DE"]),
-                "_2_group": random_str(),
-                "_2_tags": np.random.choice(["a", "b", "c", "d"]),
-                "_1_id": i,
-                "_1_age": np.random.randint(18, 80),
-                "_1_score": np.random.rand() * 100,
-                "_1_active": np.random.choice([True, False]),
-                "_1_country": np.random.choice(["US", "CA", "MX", "FR", "DE"]),
-                "_1_group": random_str(),
-                "_1_tags": np.random.choice(["a", "b", "c", "d"]),
-            }
-        )
-        for i in range(size)
-    ]
+    # the text itself does not matter here, draw a fixed pool once and index into it
+    str_pool = np.array([random_str() for _ in range(STR_POOL_SIZE)])
 
-    return make_data
+    print("making build")
+    # one bulk draw per column, the records are then built straight from the columns
+    ids = np.arange(size)
+    columns = {}
+    for prefix in PREFIXES:
+        columns[f"{prefix}id"] = ids
+        columns[f"{prefix}age"] = np.random.randint(18, 80, size)
+        columns[f"{prefix}score"] = np.random.rand(size) * 100
+        columns[f"{prefix}active"] = np.random.choice([True, False], size)
+        columns[f"{prefix}country"] = np.random.choice(COUNTRIES, size)
+        columns[f"{prefix}group"] = str_pool[np.random.randint(0, STR_POOL_SIZE, size)]
+        columns[f"{prefix}tags"] = np.random.choice(TAGS, size)
+
+    return Record.from_columns(**columns)
 
 
 def multithreaded_add(thread_num, data):
@@ -48,6 +48,44 @@ def test_add_object_many(index):
     for obj in objs:
         assert obj in result
 
+def test_add_object_many_mixed_values(index):
+    class NestedTestClass(Indexable):
+        pass
+
+    objs = [
+        TestClass(num=i, name=f"obj_{i}", nums=[i, i + 100], nested=NestedTestClass(num=i * 10))
+        for i in range(10)
+    ]
+    index.add_object_many(objs)
+
+    assert len(index.reduced_query(Q.eq("name", "obj_3")).collect()) == 1
+    assert len(index.reduced_query(Q.eq("nums", 104)).collect()) == 1
+    assert len(index.reduced_query(Q.eq("nested.num", 50)).collect()) == 1
+    assert len(index.reduced_query(Q.ge("num", 5)).collect()) == 5
+
+def test_from_columns(index):
+    objs = TestClass.from_columns(num=list(range(5)), tag=["a", "b", "a", "b", "a"])
+    assert len(objs) == 5
+    assert all(isinstance(obj, TestClass) for obj in objs)
+    assert objs[3].num == 3 and objs[3].tag == "b"
+
+    index.add_object_many(objs)
+    assert len(index.get_by_attribute(tag="a")) == 3
+
+    with pytest.raises(ValueError):
+        TestClass.from_columns(num=[1, 2], tag=["a"])
+
+def test_from_columns_skips_init(index):
+    class Row(Indexable):
+        def __init__(self, num, tag):
+            raise AssertionError("from_columns should not call __init__")
+
+    objs = Row.from_columns(num=[1, 2], tag=["a", "b"])
+    assert [(obj.num, obj.tag) for obj in objs] == [(1, "a"), (2, "b")]
+
+    index.add_object_many(objs)
+    assert len(index.get_by_attribute(tag="b")) == 1
+
 def test_query(index):
     objs = [TestClass(num=i, active=(i % 2 == 0), score=float(i) * 10.0) for i in range(10)]
     index.add_object_many(objs)
@@ -75,6 +113,39 @@ def test_query_raw_object(index):
     assert result[0].some_class is some_instance
     assert result[0].num == 4
 
+def test_query_unhashable_object(index):
+
+    class Unhashable:
+        __hash__ = None
+
+    objs = [TestClass(num=i) for i in range(10)]
+    index.add_object_many(objs)
+    value = Unhashable()
+    objs[2].thing = value
+
+    result = index.reduced_query(Q.eq('thing', value)).collect()
+    assert len(result) == 1
+    assert result[0].num == 2
+
+def test_get_by_attribute(index):
+    objs = [TestClass(num=i, active=(i % 2 == 0), tag="x") for i in range(10)]
+    index.add_object_many(objs)
+
+    result = index.get_by_attribute(active=True, tag="x")
+    assert len(result) == 5
+    assert all(obj.active is True for obj in result)
+
+    result = index.get_by_attribute(num=3, active=True)
+    assert len(result) == 0
+
+def test_len(index):
+    objs = [TestClass(num=i, active=(i % 2 == 0)) for i in range(10)]
+    index.add_object_many(objs)
+
+    assert len(index) == 10
+    assert len(index.reduced(active=True)) == 5
+    assert len(index.reduced(num=3, active=True)) == 0
+
 def test_query_chain(index):
     objs = [TestClass(num=i, active=(i % 2 == 0), score=float(i) * 10.0) for i in range(10)]
     index.add_object_many(objs)
@@ -93,6 +164,18 @@ def test_query_chain(index):
     assert len(final_res) == 1  # Should be objects with num 6
 
 
+def test_and_query_no_matches(index):
+    objs = [TestClass(num=i, active=(i % 2 == 0), name=f"obj_{i}") for i in range(10)]
+    index.add_object_many(objs)
+
+    query = Q.and_(
+        Q.eq("num", 3),
+        Q.eq("active", True),
+        Q.starts_with("name", "obj"),
+    )
+    assert len(index.reduced_query(query).collect()) == 0
+    assert len(index.get_by_attribute(num=3, name="obj_4")) == 0
+
 def test_filtered_index(index):
     objs = [TestClass(num=i, active=(i % 2 == 0), score=float(i) * 10.0) for i in range(10)]
     index.add_object_many(objs)
@@ -109,6 +192,45 @@ def test_filtered_index(index):
     assert all(obj.active is True and obj.score > 50.0 for obj in result)
     assert len(result) == 2
 
+def test_filtered_collect_is_reusable(index):
+    objs = [TestClass(num=i, active=(i % 2 == 0)) for i in range(10)]
+    index.add_object_many(objs)
+
+    filtered = index.reduced(active=True)
+    first = filtered.collect()
+    first.clear()
+
+    second = filtered.collect()
+    assert len(second) == 5
+    assert [obj.num for obj in second] == [obj.num for obj in filtered.collect()]
+
+def test_filtered_sequence_protocol(index):
+    objs = [TestClass(num=i) for i in range(10)]
+    index.add_object_many(objs)
+
+    filtered = index.reduced_query(Q.ge("num", 6))
+    assert len(filtered) == 4
+    assert filtered[0] is objs[6]
+    assert filtered[-1] is objs[9]
+    assert [obj.num for obj in filtered] == [6, 7, 8, 9]
+
+    with pytest.raises(IndexError):
+        filtered[4]
+
+def test_filtered_set_operations(index):
+    objs = [TestClass(num=i, active=(i % 2 == 0)) for i in range(10)]
+    index.add_object_many(objs)
+
+    high = index.reduced_query(Q.ge("num", 6))
+    active = index.reduced(active=True)
+    assert [obj.num for obj in high & active] == [6, 8]
+    assert [obj.num for obj in high | active] == [0, 2, 4, 6, 7, 8, 9]
+    assert [obj.num for obj in high - active] == [7, 9]
+    assert [obj.num for obj in ~high] == [0, 1, 2, 3, 4, 5]
+
+    with pytest.raises(ValueError):
+        high & Index().reduced(active=True)
+
 def test_reduce_index(index):
     objs = [TestClass(num=i, active=(i % 2 == 0), score=float(i) * 10.0) for i in range(10)]
     index.add_object_many(objs)
@@ -142,6 +264,38 @@ def test_and_query(index):
     assert len(result) == 3 # Should be objects with num 0,2,8
 
 
+def test_and_query_mixed_predicates(index):
+    objs = [
+        TestClass(num=i, active=(i % 2 == 0), group=("guest" if i % 3 == 0 else "user"))
+        for i in range(30)
+    ]
+    index.add_object_many(objs)
+
+    query = Q.and_(
+        Q.or_(Q.eq("active", True), Q.gt("num", 25)),
+        Q.ne("group", "guest"),
+        Q.lt("num", 20),
+    )
+    result = index.reduced_query(query).collect()
+    expected = {
+        o.num for o in objs
+        if (o.active or o.num > 25) and o.group != "guest" and o.num < 20
+    }
+    assert {o.num for o in result} == expected
+
+def test_nested_groups_and_double_not(index):
+    objs = [TestClass(num=i, active=i % 2 == 0) for i in range(10)]
+    index.add_object_many(objs)
+
+    query = Q.and_(Q.and_(Q.ge("num", 2), Q.eq("active", True)), Q.lt("num", 8))
+    assert sorted(obj.num for obj in index.reduced_query(query).collect()) == [2, 4, 6]
+
+    query = Q.or_(Q.or_(Q.eq("num", 1), Q.eq("num", 3)), Q.eq("num", 5))
+    assert sorted(obj.num for obj in index.reduced_query(query).collect()) == [1, 3, 5]
+
+    result = index.reduced_query(Q.not_(Q.not_(Q.eq("num", 3)))).collect()
+    assert [obj.num for obj in result] == [3]
+
 def test_nested_object_query(index):
     class NestedTestClass(Indexable):
         pass
@@ -176,6 +330,72 @@ def test_updates_reflect(index):
     result = index.reduced_query(query).collect()
     assert len(result) == 1
 
+def test_update_keeps_other_objects(index):
+    objs = [TestClass(num=i, active=True, name="same") for i in range(5)]
+    index.add_object_many(objs)
+
+    objs[0].num = 100
+    objs[0].active = False
+    objs[0].name = "other"
+
+    assert len(index.reduced_query(Q.eq("active", True)).collect()) == 4
+    assert len(index.reduced_query(Q.eq("name", "same")).collect()) == 4
+    assert len(index.reduced_query(Q.lt("num", 5)).collect()) == 4
+
+    result = index.reduced_query(Q.eq("num", 100)).collect()
+    assert len(result) == 1
+    assert result[0] is objs[0]
+
+def test_set_attr_many(index):
+    objs = [TestClass(num=i, active=True) for i in range(10)]
+    index.add_object_many(objs)
+
+    index.reduced_query(Q.lt("num", 4)).set_attr_many("active", lambda: False)
+
+    assert len(index.reduced_query(Q.eq("active", False)).collect()) == 4
+    assert len(index.reduced_query(Q.eq("active", True)).collect()) == 6
+    assert all(not obj.active for obj in objs[:4])
+
+    # one call per object, so nested values are not shared between parents
+    index.reduced_query(Q.eq("num", 7)).set_attr_many("child", lambda: TestClass(name="child_of"))
+    result = index.reduced_query(Q.eq("child.name", "child_of")).collect()
+    assert len(result) == 1
+    assert result[0] is objs[7]
+
+def test_set_attr_many_skips_removed_objects(index):
+    objs = [TestClass(num=i) for i in range(10)]
+    index.add_object_many(objs)
+
+    filtered = index.reduced_query(Q.lt("num", 6))
+    index.reduce(num=2)
+
+    calls = []
+    filtered.set_attr_many("tag", lambda: calls.append(1) or "set")
+
+    assert len(calls) == 1
+    assert objs[2].tag == "set"
+    assert filtered.values("tag") == ["set"]
+    # the removed ids did not leak the value to later filters
+    assert len(index.reduced_query(Q.eq("tag", "set"))) == 1
+    assert not hasattr(objs[3], "tag")
+    # removed ids hand out no placeholder objects either
+    assert filtered.collect() == [objs[2]]
+    assert len(filtered.rebase().collect()) == 1
+
+def test_collect_after_parent_reduce(index):
+    objs = [TestClass(num=i) for i in range(10)]
+    index.add_object_many(objs)
+
+    filtered = index.reduced_query(Q.lt("num", 6))
+    assert len(filtered.collect()) == 6
+
+    index.reduce(num=2)
+    # the memoized collect is rebuilt once the parent drops objects
+    assert filtered.collect() == [objs[2]]
+    assert list(filtered) == [objs[2]]
+    assert len(filtered) == 1
+    assert filtered[0] is objs[2]
+
 def test_union_with(index):
     objs = [TestClass(num=i, ind = "A") for i in range(10)]
     index.add_object_many(objs)
@@ -1,4 +1,7 @@
 
+import gc
+import weakref
+
 import pytest
 
 from PyThermite import Index, Indexable, QueryExpr as Q, FilteredIndex
@@ -25,15 +28,15 @@ def test_string(index):
 
     query = Q.eq("name", "object_3")
     result = index.reduced_query(query)
-    assert len(result.collect()) == 1
-    assert result.collect()[0].name == "object_3"
+    assert len(result) == 1
+    assert result[0].name == "object_3"
 
-    for r in result.collect():
+    for r in result:
         r.child = TestClass(name="child_of")
 
     nested_result = index.reduced_query(Q.eq("child.name", "child_of"))
-    assert len(nested_result.collect()) == 1
-    assert nested_result.collect()[0].name == "object_3"
+    assert len(nested_result) == 1
+    assert nested_result[0].name == "object_3"
 
 def test_string_reduced_children_cleaned_up(index):
     #  test edge case that after reduced the nested objects are cleaned up as well
@@ -41,12 +44,12 @@ def test_string_reduced_children_cleaned_up(index):
     index.add_object_many(objs)
 
     index.reduce(name="object_1")
-    assert len(index.collect()) == 5
+    assert len(index) == 5
     assert all(r.name == "object_1" for r in index.collect())
 
     nested_result = index.reduced_query(Q.eq("child.name", "child_of"))
-    assert len(nested_result.collect()) == 5
-    assert all(r.name == "object_1" for r in nested_result.collect())
+    assert len(nested_result) == 5
+    assert all(r.name == "object_1" for r in nested_result)
 
 
 def test_nest_before_index(index):
@@ -58,11 +61,11 @@ def test_nest_before_index(index):
     nested_result = index.reduced_query(Q.eq("child.name", "child_of"))
     tripple_nested_result = index.reduced_query(Q.eq("child.grandchild.name", "grandchild_of"))
 
-    assert len(nested_result.collect()) == 5
-    assert all(r.child.name == "child_of" for r in nested_result.collect())
+    assert len(nested_result) == 5
+    assert all(r.child.name == "child_of" for r in nested_result)
 
-    assert len(tripple_nested_result.collect()) == 5
-    assert all(r.child.grandchild.name == "grandchild_of" for r in tripple_nested_result.collect())
+    assert len(tripple_nested_result) == 5
+    assert all(r.child.grandchild.name == "grandchild_of" for r in tripple_nested_result)
 
 
 def test_tripple_nest_after_index(index):
@@ -71,20 +74,69 @@ def test_tripple_nest_after_index(index):
 
     query = Q.eq("name", "object_3")
     result = index.reduced_query(query)
-    assert len(result.collect()) == 1
-    assert result.collect()[0].name == "object_3"
+    assert len(result) == 1
+    assert result[0].name == "object_3"
 
-    for r in result.collect():
+    for r in result:
         r.child = TestClass(name="child_of")
 
     nested_result = index.reduced_query(Q.eq("child.name", "child_of"))
-    assert len(nested_result.collect()) == 1
-    assert nested_result.collect()[0].name == "object_3"
+    assert len(nested_result) == 1
+    assert nested_result[0].name == "object_3"
 
-    nested_result.collect()[0].child.grandchild = TestClass(name="grandchild_of")
+    nested_result[0].child.grandchild = TestClass(name="grandchild_of")
     tripple_nested_result = index.reduced_query(Q.eq("child.grandchild.name", "grandchild_of"))
-    assert len(tripple_nested_result.collect()) == 1
-    assert tripple_nested_result.collect()[0].name == "object_3"
+    assert len(tripple_nested_result) == 1
+    assert tripple_nested_result[0].name == "object_3"
+
+
+def test_reassign_child_keeps_sibling_paths(index):
+    objs = [TestClass(name=f"object_{i}", child=TestClass(num=i)) for i in range(5)]
+    index.add_object_many(objs)
+
+    objs[2].child = TestClass(num=20)
+
+    assert len(index.reduced_query(Q.eq("child.num", 2))) == 0
+    assert index.reduced_query(Q.eq("child.num", 20))[0] is objs[2]
+    # the other children are untouched by the swap
+    assert [r.name for r in index.reduced_query(Q.lt("child.num", 5))] == [
+        "object_0", "object_1", "object_3", "object_4"
+    ]
+
+
+def test_intern_shares_identical_children(index):
+    children = [
+        TestClass(name="child_of", grandchild=TestClass(name="grandchild_of").intern()).intern()
+        for _ in range(5)
+    ]
+    assert all(child is children[0] for child in children)
+    assert TestClass(name="other").intern() is not children[0]
+
+    objs = [TestClass(name=f"object_{i}", child=children[i]) for i in range(5)]
+    index.add_object_many(objs)
+    assert len(index.reduced_query(Q.eq("child.grandchild.name", "grandchild_of"))) == 5
+
+
+def test_intern_skips_iterable_values():
+    tags = [1, 2]
+    first = TestClass(name="tagged", tags=tags)
+    second = TestClass(name="tagged", tags=tags)
+    # iterable values compare by identity, neither instance becomes canonical
+    assert first.intern() is first
+    assert second.intern() is second
+
+
+def test_intern_holds_weak_references():
+    held = weakref.ref(TestClass(name="dropped").intern())
+    gc.collect()
+    assert held() is None
+
+    canonical = TestClass(name="before").intern()
+    canonical.name = "after"
+    # mutated out of its bucket, the old content gets a fresh canonical instance
+    fresh = TestClass(name="before")
+    assert fresh.intern() is fresh
+    assert TestClass(name="after").intern() is not canonical
 
 
 def test_filtered_index_chain(index):
@@ -93,19 +145,19 @@ def test_filtered_index_chain(index):
 
     query = Q.in_("name", ["object_1", "object_3"])
     result = index.reduced_query(query)
-    assert len(result.collect()) == 2
-    assert all(r.name in ["object_1", "object_3"] for r in result.collect())
+    assert len(result) == 2
+    assert all(r.name in ["object_1", "object_3"] for r in result)
 
-    for r in result.collect():
+    for r in result:
         r.child = TestClass(name="child_of")
 
     nested_result = index.reduced_query(Q.eq("child.name", "child_of"))
-    assert len(nested_result.collect()) == 2
-    assert all(r.child.name == "child_of" for r in nested_result.collect())
+    assert len(nested_result) == 2
+    assert all(r.child.name == "child_of" for r in nested_result)
 
     tripple_nested_result = nested_result.reduced_query(Q.eq("common", True))
-    assert len(tripple_nested_result.collect()) == 2
-    assert all(r.child.name == "child_of" for r in nested_result.collect())
+    assert len(tripple_nested_result) == 2
+    assert all(r.child.name == "child_of" for r in nested_result)
 
 
 def test_nested_object_query_in(index):
@@ -124,6 +176,35 @@ def test_nested_object_query_in(index):
     assert all(obj.nested.num in [20, 30, 40] for obj in result)
 
 
+def test_filtered_values_along_path(index):
+    class NestedTestClass(Indexable):
+        pass
+
+    objs = [TestClass(num=i, nested=NestedTestClass(num=i * 10)) for i in range(5)]
+    objs.append(TestClass(num=5))
+    index.add_object_many(objs)
+
+    result = index.reduced_query(Q.ge("num", 2))
+    assert result.values("num") == [2, 3, 4, 5]
+    # a missing hop reads as None
+    assert result.values("nested.num") == [20, 30, 40, None]
+
+
+def test_filtered_values_after_parent_reduce(index):
+    objs = [TestClass(num=i, keep=(i != 3)) for i in range(6)]
+    index.add_object_many(objs)
+
+    result = index.reduced_query(Q.ge("num", 2))
+    index.reduce(keep=True)
+
+    # positions keep lining up with len, indexing and iteration once objects leave
+    values = result.values("num")
+    assert values == [2, 4, 5]
+    assert len(result) == len(values)
+    assert [obj.num for obj in result] == values
+    assert result[1] is objs[4]
+
+
 def test_nested_object_query_greater(index):
     class NestedTestClass(Indexable):
         pass
@@ -274,3 +355,23 @@ def test_recursive_ownership_1(index):
 
 if __name__ == "__main__":
     test_recursive_ownership_1(Index())
+
+
+def test_parallel_or_with_nested_branch(index):
+    # large enough for the Or to fan its branches out to worker threads
+    rows = 70_000
+    objs = TestClass.from_columns(num=list(range(rows)))
+    tags = [1, 2]
+    for obj in objs[40_000:40_010]:
+        obj.child = TestClass(name="child_of", tags=tags)
+    index.add_object_many(objs)
+
+    query = Q.or_(
+        Q.lt("num", 30_000),
+        Q.gt("num", 50_000),
+        Q.eq("child.name", "child_of"),
+        Q.eq("child.tags", tags),
+    )
+    expected = 30_000 + 19_999 + 10
+    assert len(index.reduced_query(query)) == expected
+    assert len(index.reduced_query(Q.ge("num", 0)).reduced_query(query)) == expected